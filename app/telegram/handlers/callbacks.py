@@ -1,7 +1,6 @@
 """Callback query handlers for inline keyboards."""
 
-from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 
 from telegram import Update, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
@@ -13,22 +12,54 @@ from app.telegram.utils import (
     paginate_schedule,
     create_pagination_keyboard,
     escape_markdown_v2,
+    local_today_str,
+    get_rendered_schedule_page,
+    store_rendered_schedule_page,
 )
 from app.telegram.messages import get_message
 from config.log_setup import get_logger
 from config.settings import get_config
-from services.yandex_schedules.cached_client import CachedYandexSchedules
+from services.yandex_schedules.cached_client import get_cached_client
 from services.yandex_schedules.models.schedule import ScheduleRequest, ScheduleResponse
 
 logger = get_logger(__name__)
 
+# Settings are fixed for the process lifetime; resolve them once
+_CONFIG = get_config()
+_TIMEZONE = _CONFIG.timezone
 
-async def _fetch_and_format_schedule(
+
+# Data source notes, resolved once instead of on every render
+_MSG_SOURCE_CACHE = get_message("schedule_data_source_cache")
+_MSG_SOURCE_API = get_message("schedule_data_source_api")
+_MSG_SOURCE_STALE = get_message("schedule_data_source_stale")
+
+
+def peek_formatted_schedule(
+    station_id: str, page: int = 1
+) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """Return the schedule page if it was rendered moments ago, without I/O.
+
+    Lets callers answer straight away instead of showing a loading message.
+    """
+    rendered = get_rendered_schedule_page(
+        station_id, local_today_str(_TIMEZONE), page
+    )
+    if rendered is None:
+        return None
+    reply_text, keyboard = rendered
+    return f"{reply_text}\n\n{_MSG_SOURCE_CACHE}", keyboard
+
+
+async def fetch_and_format_schedule(
     station_id: str, page: int = 1
 ) -> Tuple[str, InlineKeyboardMarkup]:
     """
     Common function to fetch schedule data and format it for display.
 
+    Shared by /schedule and the schedule callbacks. If the API cannot be
+    reached, the last cached schedule is shown with a stale note instead.
+
     Args:
         station_id: The station ID to fetch schedule for
         page: Page number for pagination (default: 1)
@@ -37,25 +68,43 @@ async def _fetch_and_format_schedule(
         Tuple of (formatted_text, keyboard) for the response
 
     Raises:
+        ValueError: If there are no departures to show; the message is the
+            user-facing reply
         Exception: If schedule cannot be fetched or formatted
     """
-    config = get_config()
+    # The same page may have been rendered moments ago; reuse it
+    rendered = peek_formatted_schedule(station_id, page)
+    if rendered is not None:
+        return rendered
 
     # Create schedule request - fetch many trains to cache and filter
-    today = datetime.now(config.timezone).strftime("%Y-%m-%d")
+    today = local_today_str(_TIMEZONE)
     schedule_request = ScheduleRequest(
         station=station_id,
         date=today,
-        result_timezone=config.result_timezone,
+        result_timezone=_CONFIG.result_timezone,
         limit=500,  # Fetch many trains to cache properly and filter current ones
     )
+    client = get_cached_client()
 
-    # Use cached client to fetch schedule
-    async with CachedYandexSchedules() as client:
+    try:
+        # Use the shared cached client to fetch schedule
         schedule_response, was_cached = await client.get_schedule(schedule_request)
-
-    schedule_items = schedule_response.schedule or []
-    filtered_schedule = filter_upcoming_departures(schedule_items)
+        data_source = _MSG_SOURCE_CACHE if was_cached else _MSG_SOURCE_API
+    except Exception as e:
+        logger.error("Error fetching schedule for station %s: %s", station_id, e)
+        # Fall back to the last known schedule rather than an error
+        stale_response = await client.get_stale_schedule(schedule_request)
+        if stale_response is None:
+            raise
+        schedule_response = stale_response
+        data_source = _MSG_SOURCE_STALE
+
+    # Off-hours stations come back empty; skip the filter for those
+    schedule_items = schedule_response.schedule
+    filtered_schedule = (
+        filter_upcoming_departures(schedule_items) if schedule_items else []
+    )
 
     paginated_items, current_page, total_pages = paginate_schedule(
         filtered_schedule, page
@@ -73,34 +122,22 @@ async def _fetch_and_format_schedule(
         raise ValueError(error_message)
 
     reply_text = format_schedule_reply(
-        station_id, today, paginated_items, current_page, total_pages
-    )
-
-    data_source = (
-        get_message("schedule_data_source_cache")
-        if was_cached
-        else get_message("schedule_data_source_api")
+        station_id,
+        today,
+        paginated_items,
+        current_page,
+        total_pages,
+        station=schedule_response.station,
     )
-    final_text = f"{reply_text}\n\n{data_source}"
-
-    if schedule_response.station and schedule_response.station.title:
-        station_type_suffix = ""
-        if schedule_response.station.station_type_name:
-            escaped_type = escape_markdown_v2(schedule_response.station.station_type_name)
-            station_type_suffix = f" \\({escaped_type}\\)"
-        station_info = get_message(
-            "schedule_station_info",
-            title=escape_markdown_v2(schedule_response.station.title),
-            station_type=station_type_suffix,
-        )
-        final_text = final_text.replace(
-            f"station {station_id}", f"station {station_id}{station_info}"
-        )
 
     # Create pagination keyboard
     keyboard = create_pagination_keyboard(station_id, current_page, total_pages)
 
-    return final_text, keyboard
+    # A stale fallback should not outlive the outage
+    if data_source is not _MSG_SOURCE_STALE:
+        store_rendered_schedule_page(station_id, today, page, reply_text, keyboard)
+
+    return f"{reply_text}\n\n{data_source}", keyboard
 
 
 async def handle_schedule_from_search(
@@ -124,11 +161,14 @@ async def handle_schedule_from_search(
             await query.edit_message_text(get_message("schedule_invalid_station_id"))
             return
 
-        # Show loading state
-        await query.edit_message_text(get_message("schedule_loading_schedule"))
+        # Show loading state unless the page was rendered moments ago
+        rendered = peek_formatted_schedule(station_id, page=1)
+        if rendered is None:
+            await query.edit_message_text(get_message("schedule_loading_schedule"))
 
-        # Use shared function to fetch and format schedule
-        final_text, keyboard = await _fetch_and_format_schedule(station_id, page=1)
+            # Use shared function to fetch and format schedule
+            rendered = await fetch_and_format_schedule(station_id, page=1)
+        final_text, keyboard = rendered
 
         # Edit the message with schedule content
         await query.edit_message_text(final_text, reply_markup=keyboard)
@@ -145,8 +185,8 @@ async def handle_schedule_from_search(
     except ValueError as e:
         # Handle no departures case
         await query.edit_message_text(str(e))
-    except Exception as e:
-        logger.error("Error handling schedule from search: %s", str(e))
+    except Exception:
+        logger.exception("Error handling schedule from search")
         await query.edit_message_text(get_message("schedule_error_loading_schedule"))
 
 
@@ -173,11 +213,14 @@ async def handle_schedule_pagination(
             await query.edit_message_text(get_message("schedule_invalid_station_id"))
             return
 
-        # Show loading state
-        await query.edit_message_text(get_message("schedule_loading_page"))
+        # Show loading state unless the page was rendered moments ago
+        rendered = peek_formatted_schedule(station_id, page)
+        if rendered is None:
+            await query.edit_message_text(get_message("schedule_loading_page"))
 
-        # Use shared function to fetch and format schedule
-        final_text, keyboard = await _fetch_and_format_schedule(station_id, page)
+            # Use shared function to fetch and format schedule
+            rendered = await fetch_and_format_schedule(station_id, page)
+        final_text, keyboard = rendered
 
         # Edit the message with new content
         await query.edit_message_text(final_text, reply_markup=keyboard)
@@ -195,8 +238,8 @@ async def handle_schedule_pagination(
             await query.edit_message_text(get_message("schedule_invalid_page_number"))
         else:
             await query.edit_message_text(str(e))
-    except Exception as e:
-        logger.error("Error handling schedule pagination: %s", str(e))
+    except Exception:
+        logger.exception("Error handling schedule pagination")
         await query.edit_message_text(get_message("schedule_error_loading_page"))
 
 
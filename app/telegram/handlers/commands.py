@@ -1,3 +0,0 @@
-"""
-This file is now obsolete. Command handlers have been split into separate modules in the commands/ directory.
-"""
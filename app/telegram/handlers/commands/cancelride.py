@@ -13,7 +13,7 @@ logger = get_logger(__name__)
 async def cancelride_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cancel user's active ride matching search."""
     user = update.effective_user
-    telegram_id = getattr(user, "id", None)
+    telegram_id = user.id if user else None
 
     if telegram_id is None or update.message is None:
         logger.warning("cancelride_command called with no user or message")
@@ -23,7 +23,7 @@ async def cancelride_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     logger.info(
         "User %s (username: %s) invoked /cancelride command",
         telegram_id,
-        getattr(user, "username", "unknown"),
+        user.username,
     )
 
     try:
@@ -5,6 +5,7 @@ from app.telegram.utils import is_valid_station_id, escape_markdown_v2
 from app.telegram.messages import get_message
 from services.ai.flag_service import AIFlagService
 from services.ai.nvidia_client import NvidiaAIClient
+from services.database.user_service import UserService
 from config.settings import get_config, Config
 from config.log_setup import get_logger
 
@@ -115,8 +116,7 @@ async def function(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard_buttons = {
         get_message("keyboard_schedule_base"): "schedule_base",
         get_message("keyboard_schedule_dest"): "schedule_dest",
-        get_message("keyboard_goto"): "goto",
-        get_message("keyboard_goback"): "goback",
+        # goto/goback buttons are entry points of the ride_intent conversations
         get_message("keyboard_cancelride"): "cancelride",
         get_message("keyboard_help"): "help",
         get_message("keyboard_profile"): "profile",
@@ -127,16 +127,12 @@ async def function(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.debug("Keyboard button pressed by user %s: %s", user_info, button_action)
 
         # Get user's stations for schedule buttons
-        from services.database.user_service import UserService
-
         user = update.effective_user
-        telegram_id = getattr(user, "id", None) if user else None
+        telegram_id = user.id if user else None
 
         if button_action in [
             "schedule_base",
             "schedule_dest",
-            "goto",
-            "goback",
             "cancelride",
         ]:
             if not telegram_id:
@@ -188,16 +184,6 @@ async def function(update: Update, context: ContextTypes.DEFAULT_TYPE):
                         to_title=db_user.base_station_title,
                     )
                 return
-            elif button_action == "goto":
-                from app.telegram.handlers.commands.goto import goto_command
-
-                await goto_command(update, context)
-                return
-            elif button_action == "goback":
-                from app.telegram.handlers.commands.goback import goback_command
-
-                await goback_command(update, context)
-                return
             elif button_action == "cancelride":
                 from app.telegram.handlers.commands.cancelride import cancelride_command
 
@@ -36,11 +36,22 @@ _DEFAULT_TOLERANCE_MINUTES = 15
 # Grace period for trains that recently departed - allows users already on a train
 # to still find ride mates on that same train
 _PAST_DEPARTURE_GRACE_MINUTES = 30
-_TIME_TOKEN = re.compile(r"^(?P<h>\d{1,2})(?::(?P<m>\d{1,2}))?$")
-_RANGE_SEPARATORS = re.compile(r"\s*(?:-|–|—|до|to)\s*")
-
-
-@dataclass(slots=True)
+# "830"/"0830" (compact HHMM), or "8", "08", "8:30", "08:30"
+_TIME_ANY = re.compile(r"^(?:(?P<hm>\d{3,4})|(?P<h>\d{1,2})(?::(?P<m>\d{1,2}))?)$")
+_RANGE_SEPARATORS = ("-", "–", "—", "до", "to")
+_MIDNIGHT = time(0, 0)
+_ONE_DAY = timedelta(days=1)
+
+# Resolved once at import; neither changes while the process runs
+_TIMEZONE = get_config().timezone
+_MSG_NO_STATIONS = get_message("ride_search_no_stations")
+_MSG_SEARCH_ERROR = get_message("ride_search_error")
+_MSG_INVALID_TIME = get_message("ride_intent_invalid_time")
+_MSG_CANCELLED = get_message("ride_search_cancelled")
+_MSG_UNKNOWN_STATION = get_message("ride_intent_unknown_station")
+
+
+@dataclass(slots=True, frozen=True)
 class _RideConversationContext:
     profile: RideUserProfile
     direction: str
@@ -54,7 +65,7 @@ def build_ride_conversation(reverse: bool) -> ConversationHandler:
             return ConversationHandler.END
 
         user = update.effective_user
-        telegram_id = getattr(user, "id", None)
+        telegram_id = user.id if user else None
         if telegram_id is None:
             return ConversationHandler.END
 
@@ -64,7 +75,7 @@ def build_ride_conversation(reverse: bool) -> ConversationHandler:
             or not db_user.base_station_code
             or not db_user.destination_code
         ):
-            await update.message.reply_text(get_message("ride_search_no_stations"))
+            await update.message.reply_text(_MSG_NO_STATIONS)
             return ConversationHandler.END
 
         profile = RideUserProfile(
@@ -92,7 +103,7 @@ def build_ride_conversation(reverse: bool) -> ConversationHandler:
         await update.message.reply_text(
             get_message(
                 "ride_intent_prompt",
-                station=escape_markdown_v2(arrival_station) if arrival_station else get_message("ride_intent_unknown_station"),
+                station=escape_markdown_v2(arrival_station) if arrival_station else _MSG_UNKNOWN_STATION,
             )
         )
         return ASKING_ARRIVAL
@@ -104,23 +115,22 @@ def build_ride_conversation(reverse: bool) -> ConversationHandler:
         data: Optional[_RideConversationContext] = context.user_data.get("ride_context")
         if data is None:
             logger.warning("Ride conversation missing cached context")
-            await update.message.reply_text(get_message("ride_search_error"))
+            await update.message.reply_text(_MSG_SEARCH_ERROR)
             return ConversationHandler.END
 
         raw_input = (update.message.text or "").strip()
         if not raw_input:
-            await update.message.reply_text(get_message("ride_intent_invalid_time"))
+            await update.message.reply_text(_MSG_INVALID_TIME)
             return ASKING_ARRIVAL
 
-        config = get_config()
         parsed_intent = _parse_arrival_window(
             raw_input,
-            config.timezone,
+            _TIMEZONE,
             direction=data.direction,
         )
 
         if parsed_intent is None:
-            await update.message.reply_text(get_message("ride_intent_invalid_time"))
+            await update.message.reply_text(_MSG_INVALID_TIME)
             return ASKING_ARRIVAL
 
         request = RideSearchRequest(profile=data.profile, intent=parsed_intent)
@@ -134,14 +144,19 @@ def build_ride_conversation(reverse: bool) -> ConversationHandler:
     async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.message is not None:
             await update.message.reply_text(
-                get_message("ride_search_cancelled"),
+                _MSG_CANCELLED,
                 reply_markup=ReplyKeyboardRemove(),
             )
         context.user_data.pop("ride_context", None)
         return ConversationHandler.END
 
+    command = "goback" if reverse else "goto"
     return ConversationHandler(
-        entry_points=[CommandHandler("goback" if reverse else "goto", start)],
+        entry_points=[
+            CommandHandler(command, start),
+            # Reply-keyboard buttons enter the same conversation as the command
+            MessageHandler(filters.Text([get_message(f"keyboard_{command}")]), start),
+        ],
         states={
             ASKING_ARRIVAL: [
                 MessageHandler(filters.TEXT & ~filters.COMMAND, handle_arrival)
@@ -159,54 +174,59 @@ def _parse_arrival_window(
     tolerance_minutes: int = _DEFAULT_TOLERANCE_MINUTES,
 ) -> Optional[TravelIntentWindow]:
     now = datetime.now(timezone)
+    today = now.date()
+    localize = timezone.localize
     cleaned = raw_text.strip().lower()
-    parts = _RANGE_SEPARATORS.split(cleaned)
+    # Most inputs are a single time, so a few str.find calls settle it without
+    # going through the regex engine; _parse_time strips the surrounding spaces
+    separator_at, separator = min(
+        ((cleaned.find(sep), sep) for sep in _RANGE_SEPARATORS if sep in cleaned),
+        default=(-1, ""),
+    )
+    is_range = separator_at >= 0
 
     try:
-        if len(parts) >= 2:
-            start_time = _parse_time(parts[0])
-            end_time = _parse_time(parts[1])
+        if is_range:
+            start_time = _parse_time(cleaned[:separator_at])
+            end_time = _parse_time(cleaned[separator_at + len(separator):])
             if start_time is None or end_time is None:
                 return None
 
-            start_dt = timezone.localize(
-                datetime.combine(now.date(), start_time)
-            )
-            end_dt = timezone.localize(datetime.combine(now.date(), end_time))
+            start_dt = localize(datetime.combine(today, start_time))
+            end_dt = localize(datetime.combine(today, end_time))
 
             if end_dt <= start_dt:
                 end_dt += timedelta(days=1)
         else:
-            center_time = _parse_time(parts[0])
+            center_time = _parse_time(cleaned)
             if center_time is None:
                 return None
 
-            center_dt = timezone.localize(
-                datetime.combine(now.date(), center_time)
-            )
-            start_dt = center_dt - timedelta(minutes=tolerance_minutes)
-            day_start = timezone.localize(
-                datetime.combine(center_dt.date(), time(0, 0))
-            )
-            if start_dt < day_start:
-                start_dt = day_start
+            center_dt = localize(datetime.combine(today, center_time))
+            # Clamp to midnight only when the tolerance would cross into yesterday
+            if center_time.hour * 60 + center_time.minute < tolerance_minutes:
+                start_dt = localize(datetime.combine(today, _MIDNIGHT))
+            else:
+                start_dt = center_dt - timedelta(minutes=tolerance_minutes)
             end_dt = center_dt + timedelta(minutes=tolerance_minutes)
 
         # Allow searching for trains that departed within the grace period
         # This enables users already on a train to find ride mates on that same train
         grace_threshold = now - timedelta(minutes=_PAST_DEPARTURE_GRACE_MINUTES)
-        
+
         # Only shift to next day if the entire window is before the grace threshold
-        # This preserves the ability to match with recently departed trains
-        while end_dt < grace_threshold:
-            start_dt += timedelta(days=1)
-            end_dt += timedelta(days=1)
+        # This preserves the ability to match with recently departed trains.
+        # Shift by the smallest whole number of days that clears the threshold.
+        if end_dt < grace_threshold:
+            shift = timedelta(days=-((end_dt - grace_threshold) // _ONE_DAY))
+            start_dt += shift
+            end_dt += shift
 
         return TravelIntentWindow(
             direction="reverse" if direction == "reverse" else "forward",
             arrival_window_start=start_dt,
             arrival_window_end=end_dt,
-            tolerance_minutes=tolerance_minutes if len(parts) == 1 else 0,
+            tolerance_minutes=0 if is_range else tolerance_minutes,
         )
     except ValueError:
         return None
@@ -220,20 +240,14 @@ def _parse_time(part: str) -> Optional[time]:
     candidate = candidate.replace(" ", "")
     candidate = candidate.replace(",", ":").replace(".", ":")
 
-    if candidate.isdigit():
-        value = int(candidate)
-        if value >= 2400:
-            return None
-        if value >= 100:
-            hours = value // 100
-            minutes = value % 100
-        else:
-            hours = value
-            minutes = 0
+    match = _TIME_ANY.match(candidate)
+    if not match:
+        return None
+    compact = match.group("hm")
+    if compact is not None:
+        value = int(compact)
+        hours, minutes = value // 100, value % 100
     else:
-        match = _TIME_TOKEN.match(candidate)
-        if not match:
-            return None
         hours = int(match.group("h"))
         minutes = int(match.group("m") or 0)
 
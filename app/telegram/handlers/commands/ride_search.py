@@ -1,13 +1,15 @@
 """Shared ride search functionality for the intent-driven goto/goback commands."""
 
+import asyncio
+import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from app.telegram.messages import get_message
+from app.telegram.messages import MESSAGES, get_message
 from app.telegram.utils import escape_markdown_v2
 from config.log_setup import get_logger
 from config.settings import get_config
@@ -16,13 +18,39 @@ from services.mongodb.thread_matching_service import (
     UserIntent,
     get_thread_matching_service,
 )
-from services.yandex_schedules.cached_client import CachedYandexSchedules
-from services.yandex_schedules.models.search import SearchRequest
+from services.yandex_schedules.cached_client import get_cached_client
+from services.yandex_schedules.models.search import SearchRequest, Segment
 
 logger = get_logger(__name__)
 
-
-@dataclass(slots=True)
+# Above this many segments the window filter runs in a worker thread
+_FILTER_IN_THREAD_THRESHOLD = 64
+# How many candidate trains the reply lists before "and N more"
+_MAX_TRAINS_LISTED = 10
+# Stored searches outlive the arrival window by this much, so late matches land
+_SEARCH_RESULT_GRACE_MINUTES = 15
+_ONE_MINUTE = timedelta(minutes=1)
+
+# Settings are fixed for the process lifetime; resolve them once
+_CONFIG = get_config()
+_TIMEZONE = _CONFIG.timezone
+_THREAD_SERVICE = get_thread_matching_service()
+
+# Static reply lines, resolved once instead of on every search
+_MSG_SEARCH_SUCCESS = get_message("ride_search_success")
+_MSG_MATCHES_FOUND = get_message("ride_search_matches_found")
+_MSG_NO_MATCHES = get_message("ride_search_no_matches")
+_MSG_SEARCH_ERROR = get_message("ride_search_error")
+_MSG_UNKNOWN_STATION = get_message("ride_intent_unknown_station")
+_MSG_NEW_MATCH = get_message("ride_new_match") + "\n\n"
+_NOTIFY_THREAD_TITLE = escape_markdown_v2("совпадающий маршрут")
+_NOTIFY_DEPARTURE = escape_markdown_v2("см. ваш поиск")
+# Raw templates for the per-match reply lines, formatted directly in the loop
+_FMT_MATCH_THREAD = MESSAGES["ride_search_match_thread"]
+_FMT_MATCH_USER = MESSAGES["ride_search_match_user"]
+
+
+@dataclass(slots=True, frozen=True)
 class RideUserProfile:
     """Snapshot of the ride-related data we need about the user."""
 
@@ -36,9 +64,12 @@ class RideUserProfile:
     destination_title: str
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class TravelIntentWindow:
-    """Goal captured from the user about their desired arrival window."""
+    """Goal captured from the user about their desired arrival window.
+
+    Both window bounds are timezone-aware.
+    """
 
     direction: Literal["forward", "reverse"]
     arrival_window_start: datetime
@@ -46,7 +77,7 @@ class TravelIntentWindow:
     tolerance_minutes: int
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class RideSearchRequest:
     """Full context required to execute the ride search."""
 
@@ -57,46 +88,60 @@ class RideSearchRequest:
 async def search_rides(
     update: Update, context: ContextTypes.DEFAULT_TYPE, request: RideSearchRequest
 ) -> None:
-    """Execute the ride search given a pre-captured intent."""
+    """Execute the ride search given a pre-captured intent.
+
+    The profile in ``request`` was loaded and validated by the conversation's
+    entry point, so no further user lookup is made here.
+    """
 
     if update.message is None:
         logger.warning("search_rides called without a message to respond to")
         return
 
-    telegram_user = update.effective_user
     telegram_id = request.profile.telegram_id
+    telegram_user = update.effective_user
+    if telegram_user is None:
+        # The conversation only starts for a known user; nothing to answer for
+        logger.warning("search_rides called without a user (profile=%s)", telegram_id)
+        return
 
-    if telegram_user is None or getattr(telegram_user, "id", None) != telegram_id:
+    if telegram_user.id != telegram_id:
         logger.warning(
             "Mismatch between effective user and provided profile (user=%s, profile=%s)",
-            getattr(telegram_user, "id", None),
+            telegram_user.id,
             telegram_id,
         )
 
     command = "goback" if request.intent.direction == "reverse" else "goto"
+    # Datetimes go to the logger as-is; they are only rendered if emitted
     logger.info(
         "User %s (username: %s) invoked /%s with intent %s-%s",
         telegram_id,
-        getattr(telegram_user, "username", "unknown"),
+        telegram_user.username,
         command,
-        request.intent.arrival_window_start.isoformat(),
-        request.intent.arrival_window_end.isoformat(),
+        request.intent.arrival_window_start,
+        request.intent.arrival_window_end,
     )
 
-    config = get_config()
-    timezone = config.timezone
+    timezone = _TIMEZONE
     from_code, to_code, from_title, to_title = _resolve_directional_route(
         request.profile, request.intent.direction
     )
     start_local = request.intent.arrival_window_start.astimezone(timezone)
     end_local = request.intent.arrival_window_end.astimezone(timezone)
+    # "HH:MM" carries no MarkdownV2 specials, so it needs no escaping
+    start_hhmm = f"{start_local.hour:02d}:{start_local.minute:02d}"
+    end_hhmm = f"{end_local.hour:02d}:{end_local.minute:02d}"
 
-    searching_msg = await update.message.reply_text(
-        get_message(
-            "ride_search_searching_goal",
-            station=escape_markdown_v2(to_title) if to_title else get_message("ride_intent_unknown_station"),
-            start=escape_markdown_v2(start_local.strftime("%H:%M")),
-            end=escape_markdown_v2(end_local.strftime("%H:%M")),
+    # Send the "searching" notice while the schedule fetch is in flight
+    searching_task = asyncio.create_task(
+        update.message.reply_text(
+            get_message(
+                "ride_search_searching_goal",
+                station=escape_markdown_v2(to_title) if to_title else _MSG_UNKNOWN_STATION,
+                start=start_hhmm,
+                end=end_hhmm,
+            )
         )
     )
 
@@ -106,7 +151,7 @@ async def search_rides(
             from_=from_code,
             to=to_code,
             date=target_date.strftime("%Y-%m-%d"),
-            result_timezone=config.result_timezone,
+            result_timezone=_CONFIG.result_timezone,
             limit=300,
         )
 
@@ -118,62 +163,48 @@ async def search_rides(
             target_date,
         )
 
-        async with CachedYandexSchedules() as cached_client:
-            search_response, was_cached = await cached_client.get_search_results(
-                search_req
-            )
+        search_response, was_cached = await get_cached_client().get_search_results(
+            search_req
+        )
 
+        searching_msg = await searching_task
         segments = search_response.segments or []
-        logger.debug(
-            "Search response for %s: cached=%s, segments=%d",
-            telegram_id,
-            was_cached,
-            len(segments),
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Search response for %s: cached=%s, segments=%d",
+                telegram_id,
+                was_cached,
+                len(segments),
+            )
 
         if not segments:
             await searching_msg.edit_text(
                 get_message(
                     "ride_search_no_trains_window",
-                    start=start_local.strftime("%H:%M"),
-                    end=end_local.strftime("%H:%M"),
+                    start=start_hhmm,
+                    end=end_hhmm,
                 )
             )
             return
 
-        candidate_threads: list[CandidateThread] = []
-        for segment in segments:
-            if not segment.departure or not segment.arrival or not segment.thread:
-                continue
-
-            try:
-                arrival_dt = datetime.fromisoformat(segment.arrival).astimezone(
-                    timezone
-                )
-                departure_dt = datetime.fromisoformat(segment.departure).astimezone(
-                    timezone
-                )
-            except (ValueError, AttributeError) as parse_error:
-                logger.debug("Failed to parse segment timestamps: %s", parse_error)
-                continue
-
-            if not (
-                request.intent.arrival_window_start
-                <= arrival_dt
-                <= request.intent.arrival_window_end
-            ):
-                continue
-
-            thread = CandidateThread(
-                thread_uid=segment.thread.uid or "",
-                departure_time=departure_dt.isoformat(),
-                arrival_time=arrival_dt.isoformat(),
-                from_station_code=from_code,
-                to_station_code=to_code,
-                from_station_title=from_title,
-                to_station_title=to_title,
+        filter_args = (
+            segments,
+            request.intent,
+            timezone,
+            from_code,
+            to_code,
+            from_title,
+            to_title,
+        )
+        # Parsing hundreds of segments is CPU-bound; keep big batches off the loop
+        if len(segments) > _FILTER_IN_THREAD_THRESHOLD:
+            candidate_threads, train_lines, departures_by_uid = (
+                await asyncio.to_thread(_filter_candidates, *filter_args)
+            )
+        else:
+            candidate_threads, train_lines, departures_by_uid = _filter_candidates(
+                *filter_args
             )
-            candidate_threads.append(thread)
 
         if not candidate_threads:
             logger.info(
@@ -185,8 +216,8 @@ async def search_rides(
             await searching_msg.edit_text(
                 get_message(
                     "ride_search_no_trains_window",
-                    start=escape_markdown_v2(start_local.strftime("%H:%M")),
-                    end=escape_markdown_v2(end_local.strftime("%H:%M")),
+                    start=start_hhmm,
+                    end=end_hhmm,
                 )
             )
             return
@@ -195,21 +226,23 @@ async def search_rides(
             "User %s has %d candidate trains for arrival window %s-%s",
             telegram_id,
             len(candidate_threads),
-            request.intent.arrival_window_start.isoformat(),
-            request.intent.arrival_window_end.isoformat(),
+            request.intent.arrival_window_start,
+            request.intent.arrival_window_end,
         )
 
-        thread_service = get_thread_matching_service()
-        ttl_minutes = _calculate_dynamic_ttl_minutes(request.intent, timezone)
+        ttl_minutes = _calculate_dynamic_ttl_minutes(request.intent)
         user_intent_doc = UserIntent(
             direction=request.intent.direction,
             arrival_window_start=request.intent.arrival_window_start,
             arrival_window_end=request.intent.arrival_window_end,
-            timezone=config.result_timezone,
+            timezone=_CONFIG.result_timezone,
             tolerance_minutes=request.intent.tolerance_minutes,
         )
 
-        success = await thread_service.store_search_results(
+        thread_uids = [thread.thread_uid for thread in candidate_threads]
+        # Store before looking up overlaps: when two users search at once,
+        # at least one of them then sees the other's saved search
+        success = await _THREAD_SERVICE.store_search_results(
             telegram_id=telegram_id,
             username=request.profile.username,
             first_name=request.profile.first_name,
@@ -223,14 +256,19 @@ async def search_rides(
             ttl_minutes=ttl_minutes,
         )
 
+        # Nobody is told about a search that was not saved
         if not success:
             logger.error("Failed to store search results for user %s", telegram_id)
-            await searching_msg.edit_text(get_message("ride_search_error"))
+            await searching_msg.edit_text(_MSG_SEARCH_ERROR)
             return
 
-        thread_uids = [thread.thread_uid for thread in candidate_threads]
-        users_to_notify = await thread_service.find_users_to_notify(
-            telegram_id, thread_uids
+        users_to_notify, matches = await _THREAD_SERVICE.find_users_to_notify_and_matches(
+            telegram_id,
+            thread_uids,
+            username=request.profile.username,
+            first_name=request.profile.first_name,
+            from_station_title=from_title,
+            to_station_title=to_title,
         )
 
         if users_to_notify:
@@ -239,116 +277,57 @@ async def search_rides(
                 len(users_to_notify),
                 telegram_id,
             )
-            for user_info in users_to_notify:
-                try:
-                    notification_text = (
-                        f"{get_message('ride_new_match')}\n\n"
-                        f"{get_message(
-                            'ride_new_match_details',
-                            thread_title=escape_markdown_v2('совпадающий маршрут'),
-                            departure=escape_markdown_v2('см. ваш поиск'),
-                            name=escape_markdown_v2(user_info['new_user_name']),
-                            from_=escape_markdown_v2(user_info['new_user_from_title']),
-                            to=escape_markdown_v2(user_info['new_user_to_title']),
-                        )}"
-                    )
-                    await context.bot.send_message(
+            # Every entry describes the same new user, so one text serves all
+            new_user = users_to_notify[0]
+            notification_text = _MSG_NEW_MATCH + get_message(
+                "ride_new_match_details",
+                thread_title=_NOTIFY_THREAD_TITLE,
+                departure=_NOTIFY_DEPARTURE,
+                name=escape_markdown_v2(new_user["new_user_name"]),
+                from_=escape_markdown_v2(new_user["new_user_from_title"]),
+                to=escape_markdown_v2(new_user["new_user_to_title"]),
+            )
+            # Fire all notifications at once instead of one round-trip per user
+            results = await asyncio.gather(
+                *(
+                    context.bot.send_message(
                         chat_id=user_info["telegram_id"], text=notification_text
                     )
-                except Exception as send_error:
+                    for user_info in users_to_notify
+                ),
+                return_exceptions=True,
+            )
+            for user_info, result in zip(users_to_notify, results):
+                if isinstance(result, Exception):
                     logger.error(
                         "Failed to notify user %s: %s",
                         user_info.get("telegram_id"),
-                        send_error,
+                        result,
                     )
 
-        matches = await thread_service.find_matches(telegram_id)
         logger.info(
             "User %s has %d matching threads with other users",
             telegram_id,
             len(matches),
         )
 
-        response_lines = [
-            get_message("ride_search_success"),
-            get_message(
-                "ride_search_found_trains_window",
-                count=escape_markdown_v2(str(len(candidate_threads))),
-                start=escape_markdown_v2(start_local.strftime("%H:%M")),
-                end=escape_markdown_v2(end_local.strftime("%H:%M")),
-            ),
-            "",
-        ]
-
-        response_lines.append("🚂 *Доступные поезда:*")
-        for thread in candidate_threads[:10]:
-            departure_dt = datetime.fromisoformat(thread.departure_time).astimezone(
-                timezone
-            )
-            arrival_dt = datetime.fromisoformat(thread.arrival_time).astimezone(
-                timezone
-            )
-            response_lines.append(
-                f"  • {departure_dt.strftime('%H:%M')} → {arrival_dt.strftime('%H:%M')}"
-            )
-
-        if len(candidate_threads) > 10:
-            response_lines.append(
-                f"  \\.\\.\\.  и ещё {len(candidate_threads) - 10}"
-            )
-
-        if matches:
-            response_lines.append("")
-            response_lines.append(get_message("ride_search_matches_found"))
-            for thread_uid, matched_users in matches.items():
-                thread_info = next(
-                    (candidate for candidate in candidate_threads if candidate.thread_uid == thread_uid),
-                    None,
-                )
-                departure_str = "?"
-                if thread_info is not None:
-                    departure_str = (
-                        datetime.fromisoformat(thread_info.departure_time)
-                        .astimezone(timezone)
-                        .strftime("%H:%M")
-                    )
-
-                response_lines.append("")
-                response_lines.append(
-                    get_message(
-                        "ride_search_match_thread",
-                        thread_title=escape_markdown_v2(thread_uid[:8] + "..."),
-                        departure=escape_markdown_v2(departure_str),
-                    )
+        summary = get_message(
+            "ride_search_found_trains_window",
+            count=escape_markdown_v2(str(len(candidate_threads))),
+            start=start_hhmm,
+            end=end_hhmm,
+        )
+        await searching_msg.edit_text(
+            "\n".join(
+                _iter_response_lines(
+                    summary,
+                    len(candidate_threads),
+                    train_lines,
+                    departures_by_uid,
+                    matches,
                 )
-
-                for matched_user in matched_users:
-                    first_name = matched_user.get("first_name") or ""
-                    last_name = matched_user.get("last_name") or ""
-                    username = matched_user.get("username") or ""
-
-                    if first_name and last_name:
-                        name = f"{first_name} {last_name}"
-                    elif first_name:
-                        name = first_name
-                    elif username:
-                        name = username
-                    else:
-                        name = "Пользователь"
-
-                    response_lines.append(
-                        get_message(
-                            "ride_search_match_user",
-                            name=escape_markdown_v2(name),
-                            from_=escape_markdown_v2(matched_user.get("from_station_title", "?")),
-                            to=escape_markdown_v2(matched_user.get("to_station_title", "?")),
-                        )
-                    )
-        else:
-            response_lines.append("")
-            response_lines.append(get_message("ride_search_no_matches"))
-
-        await searching_msg.edit_text("\n".join(response_lines))
+            )
+        )
 
         logger.info("User %s /%s command completed successfully", telegram_id, command)
 
@@ -360,7 +339,168 @@ async def search_rides(
             exc,
             exc_info=True,
         )
-        await searching_msg.edit_text(get_message("ride_search_error"))
+        # The "searching" notice may itself be what failed
+        try:
+            searching_msg = await searching_task
+            await searching_msg.edit_text(_MSG_SEARCH_ERROR)
+        except Exception:
+            await update.message.reply_text(_MSG_SEARCH_ERROR)
+
+
+def _filter_candidates(
+    segments: list[Segment],
+    intent: TravelIntentWindow,
+    timezone,
+    from_code: str,
+    to_code: str,
+    from_title: str,
+    to_title: str,
+) -> tuple[list[CandidateThread], list[str], dict[str, str]]:
+    """Select segments arriving inside the intent window as candidate threads.
+
+    The reply's train list lines and each thread's "HH:MM" departure are
+    formatted in the same pass, while the parsed datetimes are at hand.
+    """
+
+    candidate_threads: list[CandidateThread] = []
+    train_lines: list[str] = []
+    departures_by_uid: dict[str, str] = {}
+    window_start = intent.arrival_window_start
+    window_end = intent.arrival_window_end
+    # Yandex already reports times in the station's local offset; only walk the
+    # tz database for segments that come back in a different one
+    local_offset = window_start.utcoffset()
+    # Yandex formats times as "YYYY-MM-DDTHH:MM:SS+HH:MM"; in the window's own
+    # offset those order as plain strings, so out-of-window segments (most of
+    # the day's schedule) are rejected without being parsed
+    window_start_iso = window_start.isoformat(timespec="seconds")
+    window_end_iso = window_end.isoformat(timespec="seconds")
+    offset_suffix = window_start_iso[19:]
+    if window_end_iso[19:] != offset_suffix:
+        offset_suffix = None
+    for segment in segments:
+        if (
+            not segment.departure
+            or not segment.arrival
+            or not segment.thread
+            or not segment.thread.uid
+        ):
+            continue
+
+        arrival = segment.arrival
+        if (
+            offset_suffix is not None
+            and len(arrival) == len(window_start_iso)
+            and arrival.endswith(offset_suffix)
+            and not (window_start_iso <= arrival <= window_end_iso)
+        ):
+            continue
+
+        # Aware datetimes compare across offsets, so filter on the raw
+        # arrival and only convert the segments that fall in the window
+        try:
+            arrival_dt = datetime.fromisoformat(arrival)
+        except ValueError as parse_error:
+            logger.debug("Failed to parse segment timestamps: %s", parse_error)
+            continue
+
+        if arrival_dt.tzinfo is None or not (
+            window_start <= arrival_dt <= window_end
+        ):
+            continue
+
+        try:
+            departure_dt = datetime.fromisoformat(segment.departure)
+        except ValueError as parse_error:
+            logger.debug("Failed to parse segment timestamps: %s", parse_error)
+            continue
+        if departure_dt.utcoffset() != local_offset:
+            departure_dt = departure_dt.astimezone(timezone)
+        if arrival_dt.utcoffset() != local_offset:
+            arrival_dt = arrival_dt.astimezone(timezone)
+
+        thread = CandidateThread(
+            thread_uid=segment.thread.uid,
+            departure_time=departure_dt,
+            arrival_time=arrival_dt,
+            from_station_code=from_code,
+            to_station_code=to_code,
+            from_station_title=from_title,
+            to_station_title=to_title,
+        )
+        candidate_threads.append(thread)
+
+        departure_hhmm = f"{departure_dt.hour:02d}:{departure_dt.minute:02d}"
+        departures_by_uid[thread.thread_uid] = departure_hhmm
+        if len(train_lines) < _MAX_TRAINS_LISTED:
+            train_lines.append(
+                f"  • {departure_hhmm} → {arrival_dt.hour:02d}:{arrival_dt.minute:02d}"
+            )
+
+    return candidate_threads, train_lines, departures_by_uid
+
+
+def _iter_response_lines(
+    summary: str,
+    candidate_count: int,
+    train_lines: list[str],
+    departures_by_uid: dict[str, str],
+    matches: dict[str, list[dict]],
+) -> Iterator[str]:
+    """Yield the lines of the ride search reply."""
+
+    yield _MSG_SEARCH_SUCCESS
+    yield summary
+    yield ""
+    yield "🚂 *Доступные поезда:*"
+    yield from train_lines
+
+    if candidate_count > _MAX_TRAINS_LISTED:
+        yield f"  \\.\\.\\.  и ещё {candidate_count - _MAX_TRAINS_LISTED}"
+
+    yield ""
+    if not matches:
+        yield _MSG_NO_MATCHES
+        return
+
+    yield _MSG_MATCHES_FOUND
+    # A user sharing several threads is listed under each; render them once
+    user_lines: dict[int, str] = {}
+    for thread_uid, matched_users in matches.items():
+        departure_str = departures_by_uid.get(thread_uid, "?")
+
+        yield ""
+        yield _FMT_MATCH_THREAD.format(
+            thread_title=escape_markdown_v2(thread_uid[:8] + "..."),
+            departure=departure_str,
+        )
+
+        for matched_user in matched_users:
+            user_line = user_lines.get(matched_user["telegram_id"])
+            if user_line is not None:
+                yield user_line
+                continue
+
+            # find_users_to_notify_and_matches projects these fields with defaults already applied
+            first_name = matched_user["first_name"]
+            last_name = matched_user["last_name"]
+            username = matched_user["username"]
+
+            if first_name and last_name:
+                name = f"{first_name} {last_name}"
+            elif first_name:
+                name = first_name
+            elif username:
+                name = username
+            else:
+                name = "Пользователь"
+
+            user_line = user_lines[matched_user["telegram_id"]] = _FMT_MATCH_USER.format(
+                name=escape_markdown_v2(name),
+                from_=escape_markdown_v2(matched_user["from_station_title"]),
+                to=escape_markdown_v2(matched_user["to_station_title"]),
+            )
+            yield user_line
 
 
 def _resolve_directional_route(
@@ -381,21 +521,19 @@ def _resolve_directional_route(
     )
 
 
-def _calculate_dynamic_ttl_minutes(
-    intent: TravelIntentWindow, timezone
-) -> int:
-    """Give each search result a TTL long enough to stay relevant."""
+def _calculate_dynamic_ttl_minutes(intent: TravelIntentWindow) -> int:
+    """Keep a search result until its arrival window has passed.
+
+    Results are matchable up to the end of the window plus a short grace,
+    capped by ``search_results_max_ttl_minutes``; Mongo's TTL monitor reaps
+    them afterwards.
+    """
 
-    now = datetime.now(timezone)
     window_end = intent.arrival_window_end
-    if window_end.tzinfo is None:
-        window_end = timezone.localize(window_end)
+    now = datetime.now(window_end.tzinfo)
+    minutes_until_goal = max(0, (window_end - now) // _ONE_MINUTE)
 
-    minutes_until_goal = max(
-        0,
-        int((window_end - now).total_seconds() // 60),
+    return min(
+        minutes_until_goal + _SEARCH_RESULT_GRACE_MINUTES,
+        _CONFIG.search_results_max_ttl_minutes,
     )
-
-    # Keep search results around a bit longer so matches can materialise.
-    ttl = minutes_until_goal + 60
-    return max(ttl, 60)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import heapq
 from datetime import datetime, timedelta
-from typing import Iterable
+from operator import itemgetter
+from typing import Iterable, NamedTuple
 
 from telegram import Update
 from telegram.ext import ContextTypes
@@ -11,14 +12,13 @@ from app.telegram.messages import get_message
 from app.telegram.utils import escape_markdown_v2
 from config.log_setup import get_logger
 from config.settings import get_config
-from services.yandex_schedules.cached_client import CachedYandexSchedules
+from services.yandex_schedules.cached_client import get_cached_client
 from services.yandex_schedules.models.search import Segment, SearchRequest
 
 logger = get_logger(__name__)
 
 
-@dataclass(slots=True)
-class RouteSegment:
+class RouteSegment(NamedTuple):
     departure: datetime
     arrival: datetime
     train_label: str
@@ -27,6 +27,10 @@ class RouteSegment:
 _MAX_RESULTS_TO_SHOW = 8
 _PAST_DEPARTURE_GRACE_MINUTES = 5
 
+# Settings are fixed for the process lifetime; resolve them once
+_CONFIG = get_config()
+_TIMEZONE = _CONFIG.timezone
+
 
 def _format_station(title: str | None, code: str) -> str:
     return title.strip() if title and title.strip() else code
@@ -34,22 +38,43 @@ def _format_station(title: str | None, code: str) -> str:
 
 def _normalise_segments(
     segments: Iterable[Segment], *, timezone, now_local: datetime
-) -> list[RouteSegment]:
-    normalised: list[RouteSegment] = []
+) -> tuple[list[RouteSegment], int]:
+    """Return the earliest segments to show and how many were eligible."""
+
+    parsed: list[tuple[datetime, datetime, Segment]] = []
+    # Segments normally arrive in the local offset already; skip the tz
+    # database walk for those
+    local_offset = now_local.utcoffset()
 
     for segment in segments:
         if not segment.departure or not segment.arrival:
             continue
 
         try:
-            departure_dt = datetime.fromisoformat(segment.departure).astimezone(
-                timezone
-            )
-            arrival_dt = datetime.fromisoformat(segment.arrival).astimezone(timezone)
+            departure_dt = datetime.fromisoformat(segment.departure)
+            arrival_dt = datetime.fromisoformat(segment.arrival)
+            if departure_dt.utcoffset() != local_offset:
+                departure_dt = departure_dt.astimezone(timezone)
+            if arrival_dt.utcoffset() != local_offset:
+                arrival_dt = arrival_dt.astimezone(timezone)
         except (ValueError, TypeError) as parse_error:
             logger.debug("Skipping segment due to parse error: %s", parse_error)
             continue
 
+        parsed.append((departure_dt, arrival_dt, segment))
+
+    if not parsed:
+        return [], 0
+
+    grace_threshold = now_local - timedelta(minutes=_PAST_DEPARTURE_GRACE_MINUTES)
+    upcoming = [item for item in parsed if item[0] >= grace_threshold] or parsed
+
+    # Only a handful are shown, so pick them without sorting the whole day and
+    # build train labels for those alone
+    display: list[RouteSegment] = []
+    for departure_dt, arrival_dt, segment in heapq.nsmallest(
+        _MAX_RESULTS_TO_SHOW, upcoming, key=itemgetter(0)
+    ):
         thread = segment.thread
         thread_number = getattr(thread, "number", None) or ""
         thread_title = getattr(thread, "title", None) or ""
@@ -58,7 +83,7 @@ def _normalise_segments(
         else:
             train_label = thread_title or thread_number or "Поезд"
 
-        normalised.append(
+        display.append(
             RouteSegment(
                 departure=departure_dt,
                 arrival=arrival_dt,
@@ -66,15 +91,7 @@ def _normalise_segments(
             )
         )
 
-    normalised.sort(key=lambda item: item.departure)
-
-    if not normalised:
-        return []
-
-    grace_threshold = now_local - timedelta(minutes=_PAST_DEPARTURE_GRACE_MINUTES)
-    upcoming = [segment for segment in normalised if segment.departure >= grace_threshold]
-
-    return upcoming or normalised
+    return display, len(upcoming)
 
 
 async def send_route_schedule(
@@ -94,21 +111,21 @@ async def send_route_schedule(
 
     loading_message = await update.message.reply_text(get_message("loading"))
 
-    config = get_config()
-    timezone = config.timezone
+    timezone = _TIMEZONE
     now_local = datetime.now(timezone)
 
     request = SearchRequest(
         from_=from_code,
         to=to_code,
         date=now_local.strftime("%Y-%m-%d"),
-        result_timezone=config.result_timezone,
+        result_timezone=_CONFIG.result_timezone,
         limit=200,
     )
 
     try:
-        async with CachedYandexSchedules() as client:
-            search_response, was_cached = await client.get_search_results(request)
+        search_response, was_cached = await get_cached_client().get_search_results(
+            request
+        )
     except Exception as exc:  # pragma: no cover - defensive logging
         logger.error(
             "Failed to fetch route schedule %s → %s: %s", from_code, to_code, exc
@@ -117,14 +134,14 @@ async def send_route_schedule(
         return
 
     segments = search_response.segments or []
-    normalised_segments = _normalise_segments(
+    display_segments, total_segments = _normalise_segments(
         segments, timezone=timezone, now_local=now_local
     )
 
     pretty_from = escape_markdown_v2(_format_station(from_title, from_code))
     pretty_to = escape_markdown_v2(_format_station(to_title, to_code))
 
-    if not normalised_segments:
+    if not display_segments:
         await loading_message.edit_text(
             get_message(
                 "route_schedule_no_results",
@@ -134,7 +151,6 @@ async def send_route_schedule(
         )
         return
 
-    display_segments = normalised_segments[:_MAX_RESULTS_TO_SHOW]
     first_departure_date = display_segments[0].departure.strftime("%d.%m")
 
     lines: list[str] = [
@@ -143,7 +159,8 @@ async def send_route_schedule(
             from_station=pretty_from,
             to_station=pretty_to,
         ),
-        get_message("route_schedule_updated", time=escape_markdown_v2(now_local.strftime("%H:%M"))),
+        # "HH:MM" carries no MarkdownV2 specials, so it needs no escaping
+        get_message("route_schedule_updated", time=f"{now_local.hour:02d}:{now_local.minute:02d}"),
         "",
         get_message("route_schedule_list_header", date=escape_markdown_v2(first_departure_date)),
     ]
@@ -152,13 +169,13 @@ async def send_route_schedule(
         lines.append(
             get_message(
                 "route_schedule_item",
-                departure=escape_markdown_v2(segment.departure.strftime("%H:%M")),
-                arrival=escape_markdown_v2(segment.arrival.strftime("%H:%M")),
+                departure=f"{segment.departure.hour:02d}:{segment.departure.minute:02d}",
+                arrival=f"{segment.arrival.hour:02d}:{segment.arrival.minute:02d}",
                 train=segment.train_label,
             )
         )
 
-    remaining = len(normalised_segments) - len(display_segments)
+    remaining = total_segments - len(display_segments)
     if remaining > 0:
         lines.append(get_message("route_schedule_more", count=escape_markdown_v2(str(remaining))))
 
@@ -1,6 +1,14 @@
 """Set user stations command with conversation handler."""
 
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+import re
+import time
+
+from telegram import (
+    CallbackQuery,
+    Update,
+    InlineKeyboardMarkup,
+    InlineKeyboardButton,
+)
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
@@ -9,13 +17,15 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
 )
-from typing import Dict, Any
-from types import SimpleNamespace
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 
 from config.log_setup import get_logger
+from services.cache.user_cache import get_user_cache
 from services.database.user_service import UserService
 from services.mongodb.stations_service import get_stations_service
-from app.telegram.messages import get_message
+from app.telegram.messages import MESSAGES, get_message
 from app.telegram.utils import escape_markdown_v2
 
 logger = get_logger(__name__)
@@ -23,64 +33,191 @@ logger = get_logger(__name__)
 # Conversation states
 CHOOSING_BASE, CHOOSING_DEST, CONFIRM = range(3)
 
-# Callback data prefixes
-STATION_SELECT = "station_select:"
-STATION_CONFIRM = "station_confirm:"
+# Callback data prefixes; kept short since Telegram caps callback data at
+# 64 bytes
+STATION_SELECT = "ss:"
+STATION_CONFIRM = "sc:"
+
+# Callback data patterns; their groups hand the parsed fields to the handlers
+_STATION_SELECT_PATTERN = re.compile(rf"^{STATION_SELECT}(base|dest):(.+)$")
+_STATION_CONFIRM_PATTERN = re.compile(rf"^{STATION_CONFIRM}(yes|no)$")
+
+# The stations service is a process-wide singleton; bind it once
+_STATIONS_SERVICE = get_stations_service()
+
+# Station searches from one user closer together than this are dropped, so
+# bursts of messages do not each run a search
+_SEARCH_DEBOUNCE_SECONDS = 0.5
+# Older entries cannot debounce anything and are purged once the map grows
+_SEARCH_DEBOUNCE_PURGE_AFTER_SECONDS = 60
+_SEARCH_DEBOUNCE_PURGE_SIZE = 1024
+# telegram user id -> time of the last accepted search on the monotonic clock
+_last_search: Dict[int, float] = {}
+
+# Telegram markups are immutable, so identical keyboards are built once and
+# shared. Station lists are keyed by kind and station codes; popular
+# searches return the same few lists
+_STATION_MARKUP_CACHE_SIZE = 256
+_station_markups: OrderedDict[Tuple[str, ...], InlineKeyboardMarkup] = OrderedDict()
+_CONFIRM_MARKUP = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton(
+                get_message("setstations_button_yes"),
+                callback_data=f"{STATION_CONFIRM}yes",
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                get_message("setstations_button_no"),
+                callback_data=f"{STATION_CONFIRM}no",
+            )
+        ],
+    ]
+)
+
+
+# Reply templates, assembled once; formatted with the station summaries
+_FMT_STATION_SUMMARY = MESSAGES["setstations_station_summary"]
+_MSG_LOCATION = get_message("setstations_location")
+_FMT_CONFIRM = (
+    f"{get_message('setstations_confirm_title')}\n"
+    f"{get_message('separator')}\n\n"
+    f"{get_message('setstations_base_station_section')}\n"
+    "{base}\n\n"
+    f"{get_message('setstations_destination_section')}\n"
+    "{dest}\n\n"
+    f"{get_message('setstations_confirm_question')}"
+)
+_FMT_BASE_SET = (
+    f"{get_message('setstations_base_set_success')}\n"
+    f"{get_message('separator')}\n\n"
+    f"{get_message('setstations_base_station_section')}\n"
+    "{base}\n\n"
+    f"{get_message('setstations_next_step')}\n"
+    f"{get_message('setstations_enter_destination')}"
+)
+_FMT_SUCCESS = (
+    f"{get_message('setstations_success_title')}\n"
+    f"{get_message('separator')}\n\n"
+    f"{get_message('setstations_base_station_section')}\n"
+    "{base}\n\n"
+    f"{get_message('setstations_destination_section')}\n"
+    "{dest}\n\n"
+    f"{get_message('setstations_success_message')}"
+)
+
 
+@dataclass(slots=True, frozen=True)
+class _ChosenStation:
+    """A station picked during the conversation, kept in user_data."""
 
-## Insert helper function for creating station objects
+    code: str
+    title: str
+    settlement_title: Optional[str]
 
 
-def _station_details(station: Any) -> Dict[str, str]:
+def _station_details(station: Optional[_ChosenStation]) -> Dict[str, str]:
     """Extract display-friendly station details with safe fallbacks."""
     if not station:
         return {"title": "-", "code": "-", "settlement": "-"}
 
-    title = getattr(station, "title", "-") or "-"
-    code = getattr(station, "code", "-") or "-"
-    settlement = getattr(station, "settlement_title", "-") or "-"
+    title = station.title or "-"
+    code = station.code or "-"
+    settlement = station.settlement_title or "-"
 
     return {"title": title, "code": code, "settlement": settlement}
 
 
+def _station_summary(station: Optional[_ChosenStation]) -> str:
+    """Render a station's summary block for the setup replies."""
+    details = _station_details(station)
+    return _FMT_STATION_SUMMARY.format(
+        title=escape_markdown_v2(details["title"]),
+        code=escape_markdown_v2(details["code"]),
+        settlement=escape_markdown_v2(details["settlement"]),
+        location_label=_MSG_LOCATION,
+    )
+
+
+def _search_debounced(telegram_id: int) -> bool:
+    """Return True if this user's station search should be dropped."""
+    now = time.monotonic()
+    if now - _last_search.get(telegram_id, 0.0) < _SEARCH_DEBOUNCE_SECONDS:
+        return True
+    _last_search[telegram_id] = now
+    if len(_last_search) > _SEARCH_DEBOUNCE_PURGE_SIZE:
+        cutoff = now - _SEARCH_DEBOUNCE_PURGE_AFTER_SECONDS
+        for stale_id in [uid for uid, last in _last_search.items() if last < cutoff]:
+            del _last_search[stale_id]
+    return False
+
+
+def _station_options_markup(kind: str, stations: List[Any]) -> InlineKeyboardMarkup:
+    """Return the keyboard listing search results for a base or dest choice."""
+    key = (kind, *(station.code for station in stations))
+    markup = _station_markups.get(key)
+    if markup is not None:
+        _station_markups.move_to_end(key)
+        return markup
+
+    markup = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    f"{station.title} ({station.code}) - {station.settlement_title}"
+                    + (f" [{station.direction}]" if station.direction else ""),
+                    callback_data=f"{STATION_SELECT}{kind}:{station.code}",
+                )
+            ]
+            for station in stations
+        ]
+    )
+    _station_markups[key] = markup
+    while len(_station_markups) > _STATION_MARKUP_CACHE_SIZE:
+        _station_markups.popitem(last=False)
+    return markup
+
+
 async def start_set_stations(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the set stations conversation."""
     user = update.effective_user
-    if not user or not hasattr(user, "id") or update.message is None:
+    # PTB provides user_data whenever there is an effective user
+    if not user or update.message is None or context.user_data is None:
         return ConversationHandler.END
     logger.info(
         "User %s started set stations", user.username if user.username else user.id
     )
 
-    # Store user data
-    if not hasattr(context, "user_data") or context.user_data is None:
-        context.user_data = {}
-    context.user_data["telegram_id"] = user.id
-    context.user_data["username"] = getattr(user, "username", None)
-    context.user_data["first_name"] = getattr(user, "first_name", None)
-    context.user_data["last_name"] = getattr(user, "last_name", None)
+    # Check if user already has stations set; returning users are answered
+    # from Redis without a database query
+    user_cache = get_user_cache()
+    stations_set = await user_cache.has_stations_set(user.id)
+    db_user = None
+    if not stations_set:
+        db_user = await UserService.get_user(user.id)
+        if db_user and db_user.base_station_code and db_user.destination_code:
+            stations_set = True
+            await user_cache.mark_stations_set(user.id)
+    if stations_set:
+        logger.info(
+            "User %s already has stations set, preventing update",
+            user.username if user.username else user.id,
+        )
+        await update.message.reply_text(get_message("setstations_already_set"))
+        return ConversationHandler.END
 
-    # Check if user already has stations set
-    db_user = await UserService.get_user(user.id)
     if db_user:
-        base_exists = bool(getattr(db_user, "base_station_code", None))
-        dest_exists = bool(getattr(db_user, "destination_code", None))
-        if base_exists and dest_exists:
-            logger.info(
-                "User %s already has stations set, preventing update",
-                user.username if user.username else user.id,
+        # The User model always has these fields; read them once
+        base_code = db_user.base_station_code
+        base_title = db_user.base_station_title
+        dest_code = db_user.destination_code
+        dest_title = db_user.destination_title
+        if base_code and not dest_code:
+            # Settlements are not stored with the user
+            context.user_data["base_station"] = _ChosenStation(
+                base_code, base_title, "Unknown"
             )
-            await update.message.reply_text(get_message("setstations_already_set"))
-            return ConversationHandler.END
-        elif base_exists and not dest_exists:
-            context.user_data["base_station"] = SimpleNamespace(
-                code=db_user.base_station_code,
-                title=db_user.base_station_title,
-                settlement_title=getattr(db_user, "base_station_settlement", "Unknown"),
-                direction="",
-            )
-            base_title = getattr(db_user, "base_station_title", "-") or "-"
-            base_code = getattr(db_user, "base_station_code", "-") or "-"
             logger.info(
                 "User %s has base station set but missing destination, prompting for destination",
                 user.username if user.username else user.id,
@@ -88,20 +225,15 @@ async def start_set_stations(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text(
                 get_message(
                     "setstations_destination_pending",
-                    base_title=escape_markdown_v2(base_title),
+                    base_title=escape_markdown_v2(base_title or "-"),
                     base_code=escape_markdown_v2(base_code),
                 )
             )
             return CHOOSING_DEST
-        elif dest_exists and not base_exists:
-            context.user_data["destination_station"] = SimpleNamespace(
-                code=db_user.destination_code,
-                title=db_user.destination_title,
-                settlement_title=getattr(db_user, "destination_settlement", "Unknown"),
-                direction="",
+        elif dest_code and not base_code:
+            context.user_data["destination_station"] = _ChosenStation(
+                dest_code, dest_title, "Unknown"
             )
-            dest_title = getattr(db_user, "destination_title", "-") or "-"
-            dest_code = getattr(db_user, "destination_code", "-") or "-"
             logger.info(
                 "User %s has destination station set but missing base, prompting for base station",
                 user.username if user.username else user.id,
@@ -109,7 +241,7 @@ async def start_set_stations(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text(
                 get_message(
                     "setstations_base_pending",
-                    dest_title=escape_markdown_v2(dest_title),
+                    dest_title=escape_markdown_v2(dest_title or "-"),
                     dest_code=escape_markdown_v2(dest_code),
                 )
             )
@@ -138,11 +270,7 @@ async def handle_base_station(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> int:
     """Handle base station input."""
-    if (
-        update.message is None
-        or not hasattr(update.message, "text")
-        or context.user_data is None
-    ):
+    if update.message is None or context.user_data is None:
         return CHOOSING_BASE
     query = (update.message.text or "").strip()
     if not query:
@@ -157,12 +285,14 @@ async def handle_base_station(
             user_id = user.id
     else:
         user_id = "unknown"
-    logger.info("User %s searching for base station with query: '%s'", user_id, query)
+    if user is not None and _search_debounced(user.id):
+        logger.debug("User %s search debounced: '%s'", user_id, query)
+        return CHOOSING_BASE
+    logger.debug("User %s searching for base station with query: '%s'", user_id, query)
 
     # Search for stations
-    service = get_stations_service()
     try:
-        stations = await service.search_stations(query, limit=5)
+        stations = await _STATIONS_SERVICE.search_stations(query, limit=5)
         logger.info(
             "User %s base station search returned %d results",
             user_id,
@@ -184,18 +314,12 @@ async def handle_base_station(
         )
         return CHOOSING_BASE
 
-    # Show options
-    keyboard = []
-    for station in stations:
-        callback_data = f"{STATION_SELECT}base:{station.code}"
-        button_text = f"{station.title} ({station.code}) - {station.settlement_title}"
-        if station.direction:
-            button_text += f" [{station.direction}]"
-        keyboard.append(
-            [InlineKeyboardButton(button_text, callback_data=callback_data)]
-        )
+    # Search results already carry full station details; keep them so the
+    # selection does not have to fetch the chosen station again
+    context.user_data["station_options"] = {station.code: station for station in stations}
 
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Show options
+    reply_markup = _station_options_markup("base", stations)
     await update.message.reply_text(
         get_message(
             "setstations_stations_found",
@@ -212,7 +336,7 @@ async def handle_station_selection(
 ) -> int:
     """Handle station selection from inline keyboard."""
     query = update.callback_query
-    if query is None or not hasattr(query, "data") or context.user_data is None:
+    if query is None or context.user_data is None or context.match is None:
         return ConversationHandler.END
     await query.answer()
 
@@ -222,37 +346,33 @@ async def handle_station_selection(
     else:
         user_id = "unknown"
 
-    data = query.data
-    if not (isinstance(data, str) and data.startswith(STATION_SELECT)):
-        return ConversationHandler.END
-
-    parts = data[len(STATION_SELECT) :].split(":", 1)
-    if len(parts) != 2:
-        return ConversationHandler.END
-
-    station_type, code = parts
-    logger.info(
+    station_type, code = context.match.groups()
+    logger.debug(
         "User %s selected %s station with code: %s", user_id, station_type, code
     )
 
-    service = get_stations_service()
+    # The options are dropped once a station was picked from them; taps on
+    # an old keyboard fall back to the lookup by code
+    option = (context.user_data.pop("station_options", None) or {}).get(code)
     try:
-        station = await service.get_station_by_code(code)
+        if option is None:
+            option = await _STATIONS_SERVICE.get_station_by_code(code)
     except Exception as e:
         logger.error("User %s failed to get station %s: %s", user_id, code, e)
         await query.edit_message_text(get_message("setstations_station_fetch_error"))
         return ConversationHandler.END
 
-    if not station:
+    if not option:
         logger.warning(
             "User %s selected non-existent station with code: %s", user_id, code
         )
         await query.edit_message_text(get_message("setstations_station_not_found"))
         return ConversationHandler.END
+    # Only what the summaries and the save need is kept for the rest of the
+    # conversation, not the whole search result
+    station = _ChosenStation(option.code, option.title, option.settlement_title)
 
     station_details = _station_details(station)
-    separator = get_message("separator")
-    location_label = get_message("setstations_location")
 
     if station_type == "base":
         context.user_data["base_station"] = station
@@ -268,22 +388,8 @@ async def handle_station_selection(
         )
         if existing_dest:
             dest_details = _station_details(existing_dest)
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        get_message("setstations_button_yes"),
-                        callback_data=f"{STATION_CONFIRM}yes",
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        get_message("setstations_button_no"),
-                        callback_data=f"{STATION_CONFIRM}no",
-                    )
-                ],
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            logger.info(
+            reply_markup = _CONFIRM_MARKUP
+            logger.debug(
                 "User %s entering confirmation with base: %s (%s), dest: %s (%s)",
                 user_id,
                 station_details["title"],
@@ -291,34 +397,15 @@ async def handle_station_selection(
                 dest_details["title"],
                 dest_details["code"],
             )
-            confirmation_text = (
-                f"{get_message('setstations_confirm_title')}\n"
-                f"{separator}\n\n"
-                f"{get_message('setstations_base_station_section')}\n"
-                f"{get_message('setstations_station_summary', title=escape_markdown_v2(station_details['title']), code=escape_markdown_v2(station_details['code']), settlement=escape_markdown_v2(station_details['settlement']), location_label=location_label)}\n\n"
-                f"{get_message('setstations_destination_section')}\n"
-                f"{get_message('setstations_station_summary', title=escape_markdown_v2(dest_details['title']), code=escape_markdown_v2(dest_details['code']), settlement=escape_markdown_v2(dest_details['settlement']), location_label=location_label)}\n\n"
-                f"{get_message('setstations_confirm_question')}"
+            confirmation_text = _FMT_CONFIRM.format(
+                base=_station_summary(station), dest=_station_summary(existing_dest)
             )
             await query.edit_message_text(confirmation_text, reply_markup=reply_markup)
             return CONFIRM
 
-        base_summary = get_message(
-            "setstations_station_summary",
-            title=escape_markdown_v2(station_details["title"]),
-            code=escape_markdown_v2(station_details["code"]),
-            settlement=escape_markdown_v2(station_details["settlement"]),
-            location_label=location_label,
-        )
-        message_text = (
-            f"{get_message('setstations_base_set_success')}\n"
-            f"{separator}\n\n"
-            f"{get_message('setstations_base_station_section')}\n"
-            f"{base_summary}\n\n"
-            f"{get_message('setstations_next_step')}\n"
-            f"{get_message('setstations_enter_destination')}"
+        await query.edit_message_text(
+            _FMT_BASE_SET.format(base=_station_summary(station))
         )
-        await query.edit_message_text(message_text)
         return CHOOSING_DEST
 
     if station_type == "dest":
@@ -327,43 +414,17 @@ async def handle_station_selection(
         base = context.user_data.get("base_station") if context.user_data else None
         base_details = _station_details(base)
         logger.info(
-            "User %s set destination station: %s (%s) - %s",
+            "User %s set destination station: %s (%s) - %s; confirming with base: %s (%s)",
             user_id,
             dest_details["title"],
             dest_details["code"],
             dest_details["settlement"],
-        )
-        logger.info(
-            "User %s entering confirmation with base: %s (%s), dest: %s (%s)",
-            user_id,
             base_details["title"],
             base_details["code"],
-            dest_details["title"],
-            dest_details["code"],
         )
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    get_message("setstations_button_yes"),
-                    callback_data=f"{STATION_CONFIRM}yes",
-                )
-            ],
-            [
-                InlineKeyboardButton(
-                    get_message("setstations_button_no"),
-                    callback_data=f"{STATION_CONFIRM}no",
-                )
-            ],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        confirmation_text = (
-            f"{get_message('setstations_confirm_title')}\n"
-            f"{separator}\n\n"
-            f"{get_message('setstations_base_station_section')}\n"
-            f"{get_message('setstations_station_summary', title=escape_markdown_v2(base_details['title']), code=escape_markdown_v2(base_details['code']), settlement=escape_markdown_v2(base_details['settlement']), location_label=location_label)}\n\n"
-            f"{get_message('setstations_destination_section')}\n"
-            f"{get_message('setstations_station_summary', title=escape_markdown_v2(dest_details['title']), code=escape_markdown_v2(dest_details['code']), settlement=escape_markdown_v2(dest_details['settlement']), location_label=location_label)}\n\n"
-            f"{get_message('setstations_confirm_question')}"
+        reply_markup = _CONFIRM_MARKUP
+        confirmation_text = _FMT_CONFIRM.format(
+            base=_station_summary(base), dest=_station_summary(station)
         )
         await query.edit_message_text(confirmation_text, reply_markup=reply_markup)
         return CONFIRM
@@ -375,7 +436,7 @@ async def handle_destination_station(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> int:
     """Handle destination station input."""
-    if update.message is None or not hasattr(update.message, "text"):
+    if update.message is None or context.user_data is None:
         return CHOOSING_DEST
     query = (update.message.text or "").strip()
     if not query:
@@ -390,14 +451,16 @@ async def handle_destination_station(
             user_id = user.id
     else:
         user_id = "unknown"
-    logger.info(
+    if user is not None and _search_debounced(user.id):
+        logger.debug("User %s search debounced: '%s'", user_id, query)
+        return CHOOSING_DEST
+    logger.debug(
         "User %s searching for destination station with query: '%s'", user_id, query
     )
 
     # Search for stations
-    service = get_stations_service()
     try:
-        stations = await service.search_stations(query, limit=5)
+        stations = await _STATIONS_SERVICE.search_stations(query, limit=5)
         logger.info(
             "User %s destination station search returned %d results",
             user_id,
@@ -419,18 +482,11 @@ async def handle_destination_station(
         )
         return CHOOSING_DEST
 
-    # Show options
-    keyboard = []
-    for station in stations:
-        callback_data = f"{STATION_SELECT}dest:{station.code}"
-        button_text = f"{station.title} ({station.code}) - {station.settlement_title}"
-        if station.direction:
-            button_text += f" [{station.direction}]"
-        keyboard.append(
-            [InlineKeyboardButton(button_text, callback_data=callback_data)]
-        )
+    # Keep the results for the selection step, as for the base station
+    context.user_data["station_options"] = {station.code: station for station in stations}
 
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Show options
+    reply_markup = _station_options_markup("dest", stations)
     await update.message.reply_text(
         get_message(
             "setstations_stations_found",
@@ -447,7 +503,7 @@ async def handle_confirmation(
 ) -> int:
     """Handle confirmation."""
     query = update.callback_query
-    if query is None or not hasattr(query, "data"):
+    if query is None or context.match is None:
         return ConversationHandler.END
     await query.answer()
 
@@ -460,95 +516,89 @@ async def handle_confirmation(
     else:
         user_id = "unknown"
 
-    data = query.data
-    if not (isinstance(data, str) and data.startswith(STATION_CONFIRM)):
-        return ConversationHandler.END
-
-    confirm = data[len(STATION_CONFIRM) :]
+    confirm = context.match.group(1)
+    # The chosen stations are not needed past this point either way
+    user_data = context.user_data if context.user_data else {}
+    base = user_data.pop("base_station", None)
+    dest = user_data.pop("destination_station", None)
 
     if confirm == "no":
         logger.info("User %s cancelled station setup", user_id)
         await query.edit_message_text(get_message("setstations_cancelled_restart"))
         return ConversationHandler.END
 
-    logger.info("User %s confirmed station setup, saving to database", user_id)
-
-    # Save to database
-    user_data = context.user_data if context.user_data else {}
-    base = user_data.get("base_station") if user_data else None
-    dest = user_data.get("destination_station") if user_data else None
+    logger.debug("User %s confirmed station setup, saving to database", user_id)
 
     if not base or not dest:
         logger.error("User %s missing station data during confirmation", user_id)
         await query.edit_message_text(get_message("setstations_missing_data"))
         return ConversationHandler.END
 
+    # Only proceed if all required fields are present
+    if not (
+        user is not None
+        and base.code
+        and base.title
+        and dest.code
+        and dest.title
+    ):
+        logger.error("User %s missing required data for saving stations", user_id)
+        await query.edit_message_text(get_message("setstations_missing_data"))
+        return ConversationHandler.END
+
+    # Saved before the conversation ends, so commands sent right after
+    # confirming already see the new stations; the upsert is one statement
+    await _save_stations(
+        query,
+        user_id,
+        user.id,
+        user.username,
+        user.first_name,
+        user.last_name,
+        base,
+        dest,
+    )
+    return ConversationHandler.END
+
+
+async def _save_stations(
+    query: CallbackQuery,
+    user_id: Any,
+    telegram_id: int,
+    username: Optional[str],
+    first_name: str,
+    last_name: Optional[str],
+    base: _ChosenStation,
+    dest: _ChosenStation,
+) -> None:
+    """Save confirmed stations and report the outcome in the confirmation message."""
     try:
-        # Ensure user exists
-        telegram_id = user_data.get("telegram_id")
-        username = user_data.get("username", "")
-        first_name = user_data.get("first_name", "")
-        last_name = user_data.get("last_name", "")
-        base_code = getattr(base, "code", "") if base and hasattr(base, "code") else ""
-        base_title = (
-            getattr(base, "title", "") if base and hasattr(base, "title") else ""
-        )
-        dest_code = getattr(dest, "code", "") if dest and hasattr(dest, "code") else ""
-        dest_title = (
-            getattr(dest, "title", "") if dest and hasattr(dest, "title") else ""
-        )
-        # Only proceed if all required fields are present
-        if not (
-            isinstance(telegram_id, int)
-            and base_code
-            and base_title
-            and dest_code
-            and dest_title
-        ):
-            logger.error("User %s missing required data for saving stations", user_id)
-            await query.edit_message_text(get_message("setstations_missing_data"))
-            return ConversationHandler.END
-        await UserService.get_or_create_user(
+        await UserService.upsert_user_stations(
             telegram_id=telegram_id,
             username=username,
             first_name=first_name,
             last_name=last_name,
+            base_station_code=base.code,
+            base_station_title=base.title,
+            destination_code=dest.code,
+            destination_title=dest.title,
         )
-        await UserService.update_user_stations(
-            telegram_id=telegram_id,
-            base_station_code=base_code,
-            base_station_title=base_title,
-            destination_code=dest_code,
-            destination_title=dest_title,
-        )
+        await get_user_cache().mark_stations_set(telegram_id)
         logger.info(
             "User %s successfully saved stations: base=%s (%s), dest=%s (%s)",
             user_id,
-            base_title,
-            base_code,
-            dest_title,
-            dest_code,
+            base.title,
+            base.code,
+            dest.title,
+            dest.code,
         )
-        base_details = _station_details(base)
-        dest_details = _station_details(dest)
-        separator = get_message("separator")
-        location_label = get_message("setstations_location")
-        success_text = (
-            f"{get_message('setstations_success_title')}\n"
-            f"{separator}\n\n"
-            f"{get_message('setstations_base_station_section')}\n"
-            f"{get_message('setstations_station_summary', title=escape_markdown_v2(base_details['title']), code=escape_markdown_v2(base_details['code']), settlement=escape_markdown_v2(base_details['settlement']), location_label=location_label)}\n\n"
-            f"{get_message('setstations_destination_section')}\n"
-            f"{get_message('setstations_station_summary', title=escape_markdown_v2(dest_details['title']), code=escape_markdown_v2(dest_details['code']), settlement=escape_markdown_v2(dest_details['settlement']), location_label=location_label)}\n\n"
-            f"{get_message('setstations_success_message')}"
+        await query.edit_message_text(
+            _FMT_SUCCESS.format(base=_station_summary(base), dest=_station_summary(dest))
         )
-        await query.edit_message_text(success_text)
     except Exception as e:
         logger.error("User %s failed to save user stations: %s", user_id, e)
         await query.edit_message_text(get_message("setstations_save_error"))
 
-    return ConversationHandler.END
-
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Cancel the conversation."""
@@ -557,6 +607,10 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
         user.username if user and user.username else (user.id if user else "unknown")
     )
     logger.info("User %s cancelled set stations conversation", user_id)
+    if context.user_data is not None:
+        context.user_data.pop("base_station", None)
+        context.user_data.pop("destination_station", None)
+        context.user_data.pop("station_options", None)
     if update.message is not None:
         await update.message.reply_text(get_message("setstations_cancelled"))
     elif update.callback_query is not None:
@@ -569,24 +623,27 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     return ConversationHandler.END
 
 
-# Conversation handler
+# Conversation handler; both choosing states accept the same station input
+# and share one selection handler
+_STATION_TEXT_FILTER = filters.TEXT & ~filters.COMMAND
+_station_selection_handler = CallbackQueryHandler(
+    handle_station_selection, pattern=_STATION_SELECT_PATTERN
+)
 set_stations_handler = ConversationHandler(
     entry_points=[CommandHandler("setstations", start_set_stations)],
     states={
         CHOOSING_BASE: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, handle_base_station),
-            CallbackQueryHandler(
-                handle_station_selection, pattern=f"^{STATION_SELECT}"
-            ),
+            MessageHandler(_STATION_TEXT_FILTER, handle_base_station),
+            _station_selection_handler,
         ],
         CHOOSING_DEST: [
-            MessageHandler(filters.TEXT & ~filters.COMMAND, handle_destination_station),
-            CallbackQueryHandler(
-                handle_station_selection, pattern=f"^{STATION_SELECT}"
-            ),
+            MessageHandler(_STATION_TEXT_FILTER, handle_destination_station),
+            _station_selection_handler,
         ],
         CONFIRM: [
-            CallbackQueryHandler(handle_confirmation, pattern=f"^{STATION_CONFIRM}"),
+            CallbackQueryHandler(
+                handle_confirmation, pattern=_STATION_CONFIRM_PATTERN
+            ),
         ],
     },
     fallbacks=[CommandHandler("cancel", cancel)],
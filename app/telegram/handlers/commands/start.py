@@ -17,7 +17,7 @@ async def function(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     user = update.effective_user
-    telegram_id = getattr(user, "id", None) if user else None
+    telegram_id = user.id if user else None
 
     # Create or update user
     if telegram_id:
@@ -5,7 +5,7 @@ from config.log_setup import get_logger
 from app.telegram.messages import get_message
 from app.telegram.utils import escape_markdown_v2
 
-from services.yandex_schedules.cached_client import CachedYandexSchedules
+from services.yandex_schedules.cached_client import get_cached_client
 
 logger = get_logger(__name__)
 
@@ -20,8 +20,7 @@ async def function(update: Update, context: ContextTypes.DEFAULT_TYPE):
     mention = user.mention_markdown_v2() if user else "there"
     logger.info("User %s requested stats", user.username if user else "unknown")
 
-    async with CachedYandexSchedules() as client:
-        stats = await client.get_cache_stats()
+    stats = await get_cached_client().get_cache_stats()
 
     title = get_message("stats_title")
     separator = get_message("separator")
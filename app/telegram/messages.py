@@ -46,13 +46,18 @@ MESSAGES = {
     "schedule_stops": "Остановки",
     "schedule_time_na": f"{EMOJIS['time']} Время: Н/Д",
     # Profile
-    "profile_title": f"{EMOJIS['user']} *Информация профиля*",
-    "profile_username": "*Имя пользователя:*",
-    "profile_first_name": "*Имя:*",
-    "profile_last_name": "*Фамилия:*",
-    "profile_base_station": f"{EMOJIS['home']} *Базовая станция:*",
-    "profile_destination": f"{EMOJIS['target']} *Назначение:*",
-    "profile_code": "Код:",
+    "profile_message": f"""{EMOJIS['user']} *Информация профиля*
+═══════════════════════
+
+🏷️ *Имя пользователя:* {{username}}
+📛 *Имя:* {{first_name}}
+📛 *Фамилия:* {{last_name}}
+
+{EMOJIS['home']} *Базовая станция:* {{base_title}}
+     🔗 Код: {{base_code}}
+
+{EMOJIS['target']} *Назначение:* {{dest_title}}
+     🔗 Код: {{dest_code}}""",
     "profile_not_found": "Профиль не найден\\. Пожалуйста, сначала установите ваши станции с помощью /setstations\\.",
     "profile_not_set": "Не установлено",
     # Set Stations
@@ -134,6 +139,7 @@ MESSAGES = {
     "schedule_error_try_again": f"{EMOJIS['tip']} *Попробуйте еще раз с правильным форматом\\!*",
     "schedule_data_source_cache": "💾 Данные из кэша",
     "schedule_data_source_api": "🌐 Свежие данные из API",
+    "schedule_data_source_stale": "💾 Устаревшие данные из кэша \\(API недоступен\\)",
     "schedule_station_info": "\n🏛️ Станция: {title}{station_type}",
     "schedule_invalid_station_id": f"{EMOJIS['error']} Неверный формат ID станции",
     "schedule_loading_schedule": "{emoji} Загрузка расписания\\.\\.\\.".format(
@@ -4,9 +4,10 @@ from contextlib import suppress
 from typing import Optional
 
 from telegram.constants import ParseMode
-from telegram.ext import Application, Defaults
+from telegram.ext import AIORateLimiter, Application, Defaults
 
 from config.log_setup import get_logger
+from services.yandex_schedules.cached_client import close_cached_client
 from .config import TelegramSettings
 from .handlers.registry import HandlerRegistry
 
@@ -24,6 +25,17 @@ class TelegramBotService:
         if not self.settings.token:
             return None
         builder = Application.builder().token(self.settings.token)
+        # Queue outgoing calls within Telegram's flood limits and retry on
+        # RetryAfter instead of surfacing 429s to the handlers
+        builder = builder.rate_limiter(
+            AIORateLimiter(
+                overall_max_rate=30,
+                overall_time_period=1,
+                group_max_rate=20,
+                group_time_period=60,
+                max_retries=3,
+            )
+        )
 
         parse_mode = self._resolve_parse_mode(self.settings.parse_mode)
         if parse_mode:
@@ -89,4 +101,5 @@ class TelegramBotService:
                 await updater.stop()
             await app.stop()
             await app.shutdown()
+            await close_cached_client()
         logger.info("Telegram bot stopped")
@@ -1,18 +1,46 @@
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
-from services.yandex_schedules.models.schedule import Schedule
+from services.yandex_schedules.models.schedule import Schedule, Station
 from .messages import get_message
 
+_MARKDOWN_V2_SPECIAL_CHARS = re.compile(r"([_*\[\]()~`>#+\-=|{}.!])")
 
+# Rendered schedule pages are reused within a short window, so repeated
+# requests for the same station skip fetching, filtering and formatting
+_RENDERED_PAGE_WINDOW_SECONDS = 30
+_RENDERED_PAGE_CACHE_SIZE = 256
+_rendered_pages: OrderedDict[
+    Tuple[str, str, int, int], Tuple[str, InlineKeyboardMarkup]
+] = OrderedDict()
+
+
+# Per-item labels for schedule replies, resolved once
+_MSG_ARRIVES = get_message("schedule_arrives")
+_MSG_DEPARTS = get_message("schedule_departs")
+_MSG_DEPARTURE = get_message("schedule_departure")
+_MSG_ARRIVAL = get_message("schedule_arrival")
+_MSG_TIME_NA = get_message("schedule_time_na")
+_MSG_PLATFORM = get_message("schedule_platform")
+_MSG_STOPS = get_message("schedule_stops")
+_ITEM_SEPARATOR = "─" * 25 + "\n\n"
+
+
+@lru_cache(maxsize=8192)
 def escape_markdown_v2(text: str) -> str:
     """Escape special characters for Telegram MarkdownV2 format.
     
     MarkdownV2 requires escaping these characters when they appear as literal text:
     _ * [ ] ( ) ~ ` > # + - = | { } . !
+
+    Results are memoized: usernames, station titles and codes repeat across
+    requests, and alphanumeric input (e.g. station codes) is returned as-is.
     
     Args:
         text: Text to escape
@@ -22,18 +50,57 @@ def escape_markdown_v2(text: str) -> str:
     """
     if not text:
         return ""
+    if text.isalnum():
+        return text
     
-    # Escape all MarkdownV2 special characters
-    special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-    result = text
-    for char in special_chars:
-        result = result.replace(char, f"\\{char}")
-    return result
+    # Escape all MarkdownV2 special characters in a single pass
+    return _MARKDOWN_V2_SPECIAL_CHARS.sub(r"\\\1", text)
+
+
+@lru_cache(maxsize=4)
+def _local_date_for_minute(minute: int, tz) -> str:
+    return datetime.fromtimestamp(minute * 60, tz).strftime("%Y-%m-%d")
+
+
+def local_today_str(tz) -> str:
+    """Return today's date in ``tz`` as YYYY-MM-DD.
+
+    The string is computed once per minute; local midnight always falls on
+    a minute boundary, so a cached value never straddles two dates.
+    """
+    return _local_date_for_minute(int(time.time()) // 60, tz)
+
+
+def get_rendered_schedule_page(
+    station_id: str, date: str, page: int
+) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+    """Return the (reply text, keyboard) rendered for this page in the current window."""
+    key = (station_id, date, page, int(time.time()) // _RENDERED_PAGE_WINDOW_SECONDS)
+    return _rendered_pages.get(key)
+
+
+def store_rendered_schedule_page(
+    station_id: str,
+    date: str,
+    page: int,
+    reply_text: str,
+    keyboard: InlineKeyboardMarkup,
+) -> None:
+    """Remember a rendered schedule page for the rest of the current window.
+
+    ``reply_text`` should not include the data source line, since a reused
+    page is always served from cache.
+    """
+    key = (station_id, date, page, int(time.time()) // _RENDERED_PAGE_WINDOW_SECONDS)
+    _rendered_pages[key] = (reply_text, keyboard)
+    # Entries from past windows are never looked up again; drop the oldest
+    while len(_rendered_pages) > _RENDERED_PAGE_CACHE_SIZE:
+        _rendered_pages.popitem(last=False)
 
 
 def is_valid_station_id(text: str) -> bool:
     """Validate message format: s followed by exactly 7 digits."""
-    return bool(re.match(r"^s\d{7}$", text))
+    return len(text) == 8 and text[0] == "s" and text[1:].isdecimal()
 
 
 def filter_upcoming_departures(
@@ -75,12 +142,28 @@ def filter_upcoming_departures(
     return upcoming
 
 
+@lru_cache(maxsize=1024)
+def _station_info_line(title: str, station_type_name: Optional[str]) -> str:
+    """Render the station details line; the same stations recur across requests."""
+    station_type_suffix = ""
+    if station_type_name:
+        # Escape station type name and parentheses for MarkdownV2
+        escaped_type = escape_markdown_v2(station_type_name)
+        station_type_suffix = f" \\({escaped_type}\\)"
+    return get_message(
+        "schedule_station_info",
+        title=escape_markdown_v2(title),
+        station_type=station_type_suffix,
+    )
+
+
 def format_schedule_reply(
     station_id: str,
     date: str,
     schedule: List[Schedule],
     current_page: int = 1,
     total_pages: int = 1,
+    station: Optional[Station] = None,
 ) -> str:
     """Format schedule data for telegram response.
 
@@ -90,6 +173,8 @@ def format_schedule_reply(
         schedule: List of schedule items
         current_page: Current page number
         total_pages: Total number of pages
+        station: Station details from the schedule response, shown under the
+            station line when it has a title
 
     Returns:
         Formatted schedule message
@@ -122,13 +207,15 @@ def format_schedule_reply(
     station_info = get_message(
         "schedule_station", station_id=station_id, station_name=station_name
     )
+    if station and station.title:
+        station_info += _station_info_line(station.title, station.station_type_name)
 
     # Add pagination if needed
     page_info = ""
     if total_pages > 1:
         page_info = f"\n{get_message('schedule_page', current_page=current_page, total_pages=total_pages)}"
 
-    reply_text = f"{header}\n{separator}\n\n{station_info}{page_info}\n\n"
+    parts = [f"{header}\n{separator}\n\n{station_info}{page_info}\n\n"]
 
     # Process each schedule item
     for i, schedule_item in enumerate(schedule):
@@ -142,41 +229,33 @@ def format_schedule_reply(
                 departure_dt = datetime.fromisoformat(
                     schedule_item.departure.replace("Z", "+00:00")
                 )
-                arrival_time = arrival_dt.strftime("%H:%M")
-                departure_time = departure_dt.strftime("%H:%M")
-                arr_text = get_message("schedule_arrives")
-                dep_text = get_message("schedule_departs")
+                arrival_time = f"{arrival_dt.hour:02d}:{arrival_dt.minute:02d}"
+                departure_time = f"{departure_dt.hour:02d}:{departure_dt.minute:02d}"
                 time_info = (
-                    f"🕒 {arr_text}: {arrival_time}  •  {dep_text}: {departure_time}"
+                    f"🕒 {_MSG_ARRIVES}: {arrival_time}  •  {_MSG_DEPARTS}: {departure_time}"
                 )
             except (ValueError, AttributeError):
-                arr_text = get_message("schedule_arrives")
-                dep_text = get_message("schedule_departs")
-                time_info = f"🕒 {arr_text}: {schedule_item.arrival}  •  {dep_text}: {schedule_item.departure}"
+                time_info = f"🕒 {_MSG_ARRIVES}: {schedule_item.arrival}  •  {_MSG_DEPARTS}: {schedule_item.departure}"
         elif schedule_item.departure:
             try:
                 dt = datetime.fromisoformat(
                     schedule_item.departure.replace("Z", "+00:00")
                 )
-                departure_time = dt.strftime("%H:%M")
-                dep_text = get_message("schedule_departure")
-                time_info = f"🕒 {dep_text}: {departure_time}"
+                departure_time = f"{dt.hour:02d}:{dt.minute:02d}"
+                time_info = f"🕒 {_MSG_DEPARTURE}: {departure_time}"
             except (ValueError, AttributeError):
-                dep_text = get_message("schedule_departure")
-                time_info = f"🕒 {dep_text}: {schedule_item.departure}"
+                time_info = f"🕒 {_MSG_DEPARTURE}: {schedule_item.departure}"
         elif schedule_item.arrival:
             try:
                 dt = datetime.fromisoformat(
                     schedule_item.arrival.replace("Z", "+00:00")
                 )
-                arrival_time = dt.strftime("%H:%M")
-                arr_text = get_message("schedule_arrival")
-                time_info = f"🕒 {arr_text}: {arrival_time}"
+                arrival_time = f"{dt.hour:02d}:{dt.minute:02d}"
+                time_info = f"🕒 {_MSG_ARRIVAL}: {arrival_time}"
             except (ValueError, AttributeError):
-                arr_text = get_message("schedule_arrival")
-                time_info = f"🕒 {arr_text}: {schedule_item.arrival}"
+                time_info = f"🕒 {_MSG_ARRIVAL}: {schedule_item.arrival}"
         else:
-            time_info = get_message("schedule_time_na")
+            time_info = _MSG_TIME_NA
 
         # Get thread information
         thread_info = "Unknown"
@@ -193,30 +272,31 @@ def format_schedule_reply(
         # Format platform information
         platform_info = ""
         if schedule_item.platform:
-            platform_text = get_message("schedule_platform")
-            platform_info = f"  🚉 {platform_text} {escape_markdown_v2(schedule_item.platform)}"
+            platform_info = f"  🚉 {_MSG_PLATFORM} {escape_markdown_v2(schedule_item.platform)}"
 
         # Enhanced formatting with better structure and spacing
-        reply_text += f"🚂 {thread_info}\n"
-        reply_text += f"{time_info}{platform_info}\n"
+        parts.append(f"🚂 {thread_info}\n{time_info}{platform_info}\n")
 
         # Add stops information if available and not too long
         if schedule_item.stops and len(schedule_item.stops) < 50:
-            stops_text = get_message("schedule_stops")
             # Escape colon for MarkdownV2
-            reply_text += f"📍 {stops_text}\\: {escape_markdown_v2(schedule_item.stops)}\n"
+            parts.append(f"📍 {_MSG_STOPS}\\: {escape_markdown_v2(schedule_item.stops)}\n")
 
         # Add visual separator between entries for better readability
-        # Escape dashes for MarkdownV2
-        reply_text += "─" * 25 + "\n\n"
+        parts.append(_ITEM_SEPARATOR)
 
-    return reply_text.strip()
+    return "".join(parts).strip()
 
 
+@lru_cache(maxsize=1024)
 def create_pagination_keyboard(
     station_id: str, current_page: int, total_pages: int
 ) -> InlineKeyboardMarkup:
-    """Create pagination keyboard for schedule navigation."""
+    """Create pagination keyboard for schedule navigation.
+
+    Telegram objects are immutable, so one keyboard per station and page
+    is shared by every reply that needs it.
+    """
     keyboard = []
 
     if total_pages <= 1:
@@ -113,9 +113,24 @@ class Config(BaseSettings):
     # Cache configuration
     cache_ttl_search: int = Field(default=3600)  # 1 hour for search results
     cache_ttl_schedule: int = Field(default=1800)  # 30 minutes for schedule results
+    cache_ttl_schedule_stale: int = Field(
+        default=86400
+    )  # Stale schedule copy served when the API is unavailable
+    cache_ttl_station: int = Field(
+        default=86400
+    )  # 24 hours for station metadata, which rarely changes
+    cache_ttl_station_search: int = Field(
+        default=600
+    )  # 10 minutes for station search results
+    cache_ttl_user_stations_set: int = Field(
+        default=86400
+    )  # 24 hours for the "stations already set" flag
     cache_readable_keys: bool = Field(
         default=False
     )  # Use readable keys instead of hashes
+    search_results_max_ttl_minutes: int = Field(
+        default=1440
+    )  # Upper bound on how long a stored ride search stays matchable
 
     @field_validator("result_timezone")
     def validate_timezone(cls, v):
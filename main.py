@@ -1,5 +1,7 @@
 import asyncio
 
+import uvloop
+
 from app.api.service import ApiServerService
 from app.telegram.service import TelegramBotService
 from config.log_setup import get_logger
@@ -29,4 +31,5 @@ async def main():
 
 
 if __name__ == "__main__":  # pragma: no cover
-    asyncio.run(main())
+    # libuv-backed loop: cheaper awaits and socket I/O for the bot, API and DB clients
+    uvloop.run(main())
@@ -10,13 +10,20 @@ from redis.exceptions import RedisError
 
 from config.log_setup import get_logger
 from services.cache.redis_client import BaseRedisClient
-from services.yandex_schedules.models.schedule import ScheduleRequest, ScheduleResponse
+from services.yandex_schedules.models.schedule import (
+    ScheduleRequest,
+    ScheduleResponse,
+    Station,
+)
 from services.yandex_schedules.models.search import SearchRequest, SearchResponse
 
 logger = get_logger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
+# Long-lived copies kept as a fallback for when the API is unavailable
+_STALE_KEY_PREFIX = "stale:"
+
 
 class YandexSchedulesCache(BaseRedisClient):
     """Redis cache manager for Yandex Schedules API responses."""
@@ -197,13 +204,48 @@ class YandexSchedulesCache(BaseRedisClient):
         )
         cache_key = self._generate_cache_key("schedule", request)
         ttl = self.config.cache_ttl_schedule
-        result = await self._set_cached_response(cache_key, response, ttl)
+        result = await self._set_cached_response(
+            cache_key,
+            response,
+            ttl,
+            stale_ttl=self.config.cache_ttl_schedule_stale,
+        )
         if result:
             logger.info("Schedule results cached successfully for key: %s", cache_key)
         else:
             logger.warning("Failed to cache schedule results for key: %s", cache_key)
         return result
 
+    async def get_station_info(self, station_code: str) -> Optional[Station]:
+        """Get cached station metadata."""
+        cache_key = f"station:{station_code}"
+        result = await self._get_cached_response(cache_key, Station)
+        if result is not None:
+            logger.debug("Cache hit for station info with key: %s", cache_key)
+        return result
+
+    async def set_station_info(self, station_code: str, station: Station) -> bool:
+        """Cache station metadata under its own, longer TTL."""
+        cache_key = f"station:{station_code}"
+        return await self._set_cached_response(
+            cache_key, station, self.config.cache_ttl_station
+        )
+
+    async def get_stale_schedule_results(
+        self, request: ScheduleRequest, response_type: Type[T] = ScheduleResponse
+    ) -> Optional[T]:
+        """Get the long-lived copy of schedule results, ignoring freshness.
+
+        Only meant as a fallback when the API cannot be reached.
+        """
+        cache_key = _STALE_KEY_PREFIX + self._generate_cache_key("schedule", request)
+        result = await self._get_cached_response(cache_key, response_type)
+        if result is not None:
+            logger.info("Stale cache hit for schedule results with key: %s", cache_key)
+        else:
+            logger.info("No stale schedule results for key: %s", cache_key)
+        return result
+
     async def _get_cached_response(
         self, cache_key: str, response_type: Type[T]
     ) -> Optional[T]:
@@ -253,9 +295,17 @@ class YandexSchedulesCache(BaseRedisClient):
         return response_type(**response_dict)
 
     async def _set_cached_response(
-        self, cache_key: str, response: BaseModel, ttl: int
+        self,
+        cache_key: str,
+        response: BaseModel,
+        ttl: int,
+        stale_ttl: Optional[int] = None,
     ) -> bool:
-        """Set cached response in Redis with TTL."""
+        """Set cached response in Redis with TTL.
+
+        When ``stale_ttl`` is given, the same payload is also stored under
+        the stale key so it outlives the fresh entry.
+        """
         logger.debug("_set_cached_response called for key: %s, ttl: %d", cache_key, ttl)
         try:
             redis_client = await self._get_redis()
@@ -265,7 +315,13 @@ class YandexSchedulesCache(BaseRedisClient):
                 response.model_dump_json, by_alias=True
             )
 
-            result = await redis_client.setex(cache_key, ttl, response_json)
+            if stale_ttl:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.setex(cache_key, ttl, response_json)
+                    pipe.setex(_STALE_KEY_PREFIX + cache_key, stale_ttl, response_json)
+                    result, _ = await pipe.execute()
+            else:
+                result = await redis_client.setex(cache_key, ttl, response_json)
 
             if result:
                 logger.info("Cached response for key: %s (TTL: %ds)", cache_key, ttl)
@@ -336,10 +392,8 @@ class YandexSchedulesCache(BaseRedisClient):
 
     async def shutdown(self):
         """Properly close Redis connection on application shutdown."""
-        redis_client = type(self)._redis
-        if redis_client:
-            await redis_client.close()
-            type(self)._redis = None
+        if BaseRedisClient._redis:
+            await self.close_connection()
             logger.info("Redis connection closed gracefully")
 
 
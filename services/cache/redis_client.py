@@ -15,6 +15,9 @@ logger = get_logger(__name__)
 class BaseRedisClient:
     """Base Redis client that can be shared across services."""
 
+    # One connection pool for the whole process: every subclass goes through
+    # BaseRedisClient explicitly, since assigning on cls would give each
+    # subclass a pool of its own
     _redis: Optional[AsyncRedis] = None
     _redis_lock: Optional[asyncio.Lock] = None
 
@@ -22,14 +25,14 @@ class BaseRedisClient:
         """Cache configuration reference."""
         self.config = get_config()
 
-    @classmethod
-    async def _get_redis(cls) -> AsyncRedis:
-        """Get or create a shared Redis connection."""
-        if cls._redis is None:
-            if cls._redis_lock is None:
-                cls._redis_lock = asyncio.Lock()
-            async with cls._redis_lock:
-                if cls._redis is None:
+    @staticmethod
+    async def _get_redis() -> AsyncRedis:
+        """Get or create the shared Redis connection."""
+        if BaseRedisClient._redis is None:
+            if BaseRedisClient._redis_lock is None:
+                BaseRedisClient._redis_lock = asyncio.Lock()
+            async with BaseRedisClient._redis_lock:
+                if BaseRedisClient._redis is None:
                     try:
                         config = get_config()
                         redis_options = config.redis_connection_kwargs
@@ -44,19 +47,19 @@ class BaseRedisClient:
                                 **redis_options["kwargs"],
                             )
                         await redis_client.ping()
-                        cls._redis = redis_client
+                        BaseRedisClient._redis = redis_client
                         logger.info("Redis connection established successfully")
                     except RedisError as e:
                         logger.error("Failed to connect to Redis: %s", e)
                         raise
-        return cls._redis
+        return BaseRedisClient._redis
 
-    @classmethod
-    async def close_connection(cls):
+    @staticmethod
+    async def close_connection():
         """Close the shared Redis connection."""
-        if cls._redis:
-            await cls._redis.close()
-            cls._redis = None
+        if BaseRedisClient._redis:
+            await BaseRedisClient._redis.close()
+            BaseRedisClient._redis = None
 
     async def close(self):
         """Close Redis connection (alias for compatibility)."""
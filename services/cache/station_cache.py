@@ -0,0 +1,86 @@
+"""Redis cache for station lookups shared by all bot processes."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from config.log_setup import get_logger
+from services.cache.redis_client import BaseRedisClient
+
+logger = get_logger(__name__)
+
+
+class StationsCache(BaseRedisClient):
+    """Redis cache for station search results and single stations.
+
+    Entries are stored as plain documents; the stations service turns them
+    back into its models.
+    """
+
+    async def get_search_results(
+        self, norm_query: str, limit: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Get cached station search results for a normalized query."""
+        return await self._get_json(f"stations:search:{limit}:{norm_query}")
+
+    async def set_search_results(
+        self, norm_query: str, limit: int, documents: List[Dict[str, Any]]
+    ) -> bool:
+        """Cache station search results for a normalized query."""
+        return await self._set_json(
+            f"stations:search:{limit}:{norm_query}",
+            documents,
+            self.config.cache_ttl_station_search,
+        )
+
+    async def get_station(self, code: str) -> Optional[Dict[str, Any]]:
+        """Get a cached station document by code."""
+        return await self._get_json(f"stations:code:{code}")
+
+    async def set_station(self, code: str, document: Dict[str, Any]) -> bool:
+        """Cache a station document by code."""
+        return await self._set_json(
+            f"stations:code:{code}", document, self.config.cache_ttl_station
+        )
+
+    async def _get_json(self, cache_key: str) -> Optional[Any]:
+        try:
+            redis_client = await self._get_redis()
+            cached_data = await redis_client.get(cache_key)
+        except RedisError as e:
+            logger.error("Redis error when getting cache key %s: %s", cache_key, e)
+            return None
+
+        if cached_data is None:
+            logger.debug("Cache miss for key: %s", cache_key)
+            return None
+        try:
+            return json.loads(cached_data)
+        except json.JSONDecodeError as e:
+            logger.error("Error deserializing cached data for key %s: %s", cache_key, e)
+            return None
+
+    async def _set_json(self, cache_key: str, value: Any, ttl: int) -> bool:
+        try:
+            redis_client = await self._get_redis()
+            return bool(
+                await redis_client.setex(
+                    cache_key, ttl, json.dumps(value, ensure_ascii=False)
+                )
+            )
+        except RedisError as e:
+            logger.error("Redis error when setting cache key %s: %s", cache_key, e)
+            return False
+
+
+# Global cache instance
+_stations_cache: Optional[StationsCache] = None
+
+
+def get_stations_cache() -> StationsCache:
+    """Get or create the global stations cache instance."""
+    global _stations_cache
+    if _stations_cache is None:
+        _stations_cache = StationsCache()
+    return _stations_cache
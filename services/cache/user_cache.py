@@ -0,0 +1,54 @@
+"""Redis cache for per-user flags that would otherwise need a database query."""
+
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from config.log_setup import get_logger
+from services.cache.redis_client import BaseRedisClient
+
+logger = get_logger(__name__)
+
+
+class UserCache(BaseRedisClient):
+    """Redis cache for user state.
+
+    Only the fact that a user finished station setup is kept: stations are
+    never unset, so the flag cannot go stale.
+    """
+
+    async def has_stations_set(self, telegram_id: int) -> bool:
+        """Return True if the user is known to have both stations set."""
+        cache_key = f"user:{telegram_id}:stations_set"
+        try:
+            redis_client = await self._get_redis()
+            return await redis_client.exists(cache_key) > 0
+        except RedisError as e:
+            logger.error("Redis error when getting cache key %s: %s", cache_key, e)
+            return False
+
+    async def mark_stations_set(self, telegram_id: int) -> bool:
+        """Remember that the user has both stations set."""
+        cache_key = f"user:{telegram_id}:stations_set"
+        try:
+            redis_client = await self._get_redis()
+            return bool(
+                await redis_client.setex(
+                    cache_key, self.config.cache_ttl_user_stations_set, "1"
+                )
+            )
+        except RedisError as e:
+            logger.error("Redis error when setting cache key %s: %s", cache_key, e)
+            return False
+
+
+# Global cache instance
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get or create the global user cache instance."""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+    return _user_cache
@@ -59,21 +59,43 @@ class UserService:
         return user
 
     @staticmethod
-    async def update_user_stations(
+    async def upsert_user_stations(
         telegram_id: int,
+        username: Optional[str],
+        first_name: Optional[str],
+        last_name: Optional[str],
         base_station_code: str,
         base_station_title: str,
         destination_code: str,
         destination_title: str,
-    ) -> User:
-        """Update user's station preferences."""
-        user = await User.get(telegram_id=telegram_id)
-        user.base_station_code = base_station_code
-        user.base_station_title = base_station_title
-        user.destination_code = destination_code
-        user.destination_title = destination_title
-        await user.save()
-        return user
+    ) -> None:
+        """Create the user if needed and set their stations in one statement.
+
+        Issues a single INSERT ... ON CONFLICT (telegram_id) DO UPDATE; as with
+        get_or_create_user, an existing user keeps their stored names.
+        """
+        await User.bulk_create(
+            [
+                User(
+                    telegram_id=telegram_id,
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    base_station_code=base_station_code,
+                    base_station_title=base_station_title,
+                    destination_code=destination_code,
+                    destination_title=destination_title,
+                )
+            ],
+            on_conflict=["telegram_id"],
+            update_fields=[
+                "base_station_code",
+                "base_station_title",
+                "destination_code",
+                "destination_title",
+                "updated_at",
+            ],
+        )
 
     @staticmethod
     async def get_user(telegram_id: int) -> Optional[User]:
@@ -1,24 +1,43 @@
 """MongoDB service for stations data."""
 
 import asyncio
-from typing import List, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 from pydantic import BaseModel
 from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
 from pymongo.asynchronous.database import AsyncDatabase
 
 from config.log_setup import get_logger
 from config.settings import get_config
+from services.cache.station_cache import get_stations_cache
 
 
 COND_KEY = "$cond"
 
+# Popular station names are searched over and over; results are kept
+# in-process for a few minutes
+_SEARCH_CACHE_TTL_SECONDS = 300
+_SEARCH_CACHE_SIZE = 1024
+
+# Only stations that can be placed on a route are offered in search
+_SEARCHABLE_STATION_FILTERS = [
+    {"direction": {"$ne": None}},
+    {"direction": {"$ne": ""}},
+    {"region_title": {"$ne": None}},
+    {"region_title": {"$ne": ""}},
+]
+
 
 class StationDocument(BaseModel):
     """Station document for MongoDB."""
 
     code: str  # Primary code from codes.yandex_code or similar
     title: str
+    title_lower: str = ""  # Lowercased title for index-backed prefix search
     station_type: Optional[str]
     transport_type: str
     direction: Optional[str]
@@ -80,9 +99,11 @@ def _build_single_station_document(
     station_type = getattr(station, "station_type", None)
     transport_type = getattr(station, "transport_type", None)
 
+    title = getattr(station, "title", "") or ""
     doc = StationDocument(
         code=primary_code,
-        title=getattr(station, "title", "") or "",
+        title=title,
+        title_lower=title.lower(),
         station_type=station_type.value if station_type else None,
         transport_type=transport_type.value if transport_type else "",
         direction=getattr(station, "direction", None),
@@ -107,6 +128,11 @@ class StationsService:
         self.config = get_config()
         self._client: Optional[AsyncMongoClient] = None
         self._db: Optional[AsyncDatabase] = None
+        self._indexes_ensured = False
+        # (normalized query, limit) -> (expiry on the monotonic clock, results)
+        self._search_cache: OrderedDict[
+            Tuple[str, int], Tuple[float, List[StationDocument]]
+        ] = OrderedDict()
         self._logger = get_logger(__name__)
 
     async def _get_client(self) -> AsyncMongoClient:
@@ -162,37 +188,72 @@ class StationsService:
         return self._db
 
     async def get_stations_collection(self):
-        """Get stations collection."""
+        """Get stations collection, ensuring its indexes once per process."""
         db = await self._get_db()
         collection_name = self.config.mongodb_stations_collection or "stations"
-        return db[collection_name]
+        collection = db[collection_name]
+        if not self._indexes_ensured:
+            try:
+                await self._ensure_indexes(collection)
+                self._indexes_ensured = True
+            except Exception as e:
+                self._logger.warning(
+                    "Failed to create indexes on %s: %s", collection_name, e
+                )
+        return collection
+
+    @staticmethod
+    async def _ensure_indexes(collection) -> None:
+        await collection.create_index("code", unique=True)
+        await collection.create_index("title")
+        await collection.create_index("title_lower")
+        await collection.create_index("all_codes")
+        # Whole-word station search over titles and codes only; settlement
+        # and region words would pull in every station of a town or region.
+        # "none" skips stemming and stop words so names and codes are
+        # indexed as written
+        text_index = [("title", "text"), ("all_codes", "text")]
+        try:
+            await collection.create_index(
+                text_index, name="stations_search_text", default_language="none"
+            )
+        except OperationFailure:
+            # A collection holds one text index; replace an older definition
+            await collection.drop_index("stations_search_text")
+            await collection.create_index(
+                text_index, name="stations_search_text", default_language="none"
+            )
 
     async def search_stations(
         self, query: str, limit: int = 10
     ) -> List[StationDocument]:
-        """Search stations by title or code."""
-        collection = await self.get_stations_collection()
-
-        # Use aggregation pipeline to score and sort results
+        """Search stations by title or code.
+
+        Whole words are looked up through the text index and title prefixes
+        (e.g. "домо") through the lowercased title index, and both are ranked
+        together. The slower regex scan over titles only runs when they do
+        not fill ``limit``; it can add nothing that would outrank them.
+        Results are cached per normalized query for a few minutes, in
+        process and in Redis so other workers reuse them.
+        """
         # Normalize query for exact title match (case-insensitive, trimmed)
         norm_query = query.strip().lower()
-        pipeline = [
-            {
-                "$match": {
-                    "$and": [
-                        {
-                            "$or": [
-                                {"title": {"$regex": query, "$options": "i"}},
-                                {"all_codes": {"$in": [query]}},
-                            ]
-                        },
-                        {"direction": {"$ne": None}},
-                        {"direction": {"$ne": ""}},
-                        {"region_title": {"$ne": None}},
-                        {"region_title": {"$ne": ""}},
-                    ]
-                }
-            },
+
+        cache_key = (norm_query, limit)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._search_cache.move_to_end(cache_key)
+            return cached[1]
+
+        shared = await get_stations_cache().get_search_results(norm_query, limit)
+        if shared is not None:
+            stations = [StationDocument(**doc) for doc in shared]
+            self._remember_search(cache_key, stations)
+            return stations
+
+        collection = await self.get_stations_collection()
+        # Score and sort results the same way for both lookups
+        ranking = [
             {
                 "$addFields": {
                     "score": {
@@ -210,12 +271,18 @@ class StationsService:
                                     "then": 4,  # Exact code match
                                     "else": {
                                         COND_KEY: {
+                                            # Plain substring test; no regex
+                                            # is compiled per document
                                             "if": {
-                                                "$regexMatch": {
-                                                    "input": "$title",
-                                                    "regex": query,
-                                                    "options": "i",
-                                                }
+                                                "$gte": [
+                                                    {
+                                                        "$indexOfCP": [
+                                                            {"$toLower": "$title"},
+                                                            norm_query,
+                                                        ]
+                                                    },
+                                                    0,
+                                                ]
                                             },
                                             "then": 2,  # Partial title match
                                             "else": 1,  # Other
@@ -230,15 +297,82 @@ class StationsService:
             {"$sort": {"score": -1, "title": 1}},
             {"$limit": limit},
         ]
+
+        found: dict = {}
+        stages = [
+            {"$text": {"$search": query}},
+            # An anchored, case-sensitive regex is a range scan on the index
+            {"title_lower": {"$regex": f"^{re.escape(norm_query)}"}},
+        ]
+        for match in stages:
+            try:
+                results = await self._search_stage(collection, match, ranking)
+            except OperationFailure as e:
+                if "$text" not in match:
+                    raise
+                # No text index (e.g. index creation failed); the other
+                # stages still answer the search
+                self._logger.warning("Station text search unavailable: %s", e)
+                continue
+            for doc in results:
+                found.setdefault(doc["code"], doc)
+
+        # Substring and code matches score no higher than what the indexed
+        # stages found, so the scan is only needed to fill up the list
+        if len(found) < limit:
+            scan_match = {
+                "$or": [
+                    {"title": {"$regex": query, "$options": "i"}},
+                    {"all_codes": {"$in": [query]}},
+                ]
+            }
+            for doc in await self._search_stage(collection, scan_match, ranking):
+                found.setdefault(doc["code"], doc)
+
+        ranked = sorted(found.values(), key=lambda doc: (-doc["score"], doc["title"]))
+        stations = [StationDocument(**doc) for doc in ranked[:limit]]
+
+        self._remember_search(cache_key, stations)
+        await get_stations_cache().set_search_results(
+            norm_query, limit, [station.model_dump() for station in stations]
+        )
+        return stations
+
+    def _remember_search(
+        self, cache_key: Tuple[str, int], stations: List[StationDocument]
+    ) -> None:
+        self._search_cache[cache_key] = (
+            time.monotonic() + _SEARCH_CACHE_TTL_SECONDS,
+            stations,
+        )
+        self._search_cache.move_to_end(cache_key)
+        while len(self._search_cache) > _SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+
+    @staticmethod
+    async def _search_stage(collection, match: dict, ranking: list) -> list:
+        pipeline = [
+            {"$match": {"$and": [match, *_SEARCHABLE_STATION_FILTERS]}},
+            *ranking,
+        ]
         cursor = await collection.aggregate(pipeline)
-        results = await cursor.to_list(length=limit)
-        return [StationDocument(**doc) for doc in results]
+        # ranking ends with $limit, so the cursor holds at most that many
+        return await cursor.to_list()
 
     async def get_station_by_code(self, code: str) -> Optional[StationDocument]:
-        """Get station by code."""
+        """Get station by code, from Redis when another lookup cached it."""
+        stations_cache = get_stations_cache()
+        cached = await stations_cache.get_station(code)
+        if cached is not None:
+            return StationDocument(**cached)
+
         collection = await self.get_stations_collection()
         doc = await collection.find_one({"code": code})
-        return StationDocument(**doc) if doc else None
+        if not doc:
+            return None
+        station = StationDocument(**doc)
+        await stations_cache.set_station(code, station.model_dump())
+        return station
 
     async def populate_stations(self, stations_data):
         """Populate MongoDB with stations from Yandex API response."""
@@ -249,16 +383,16 @@ class StationsService:
 
         # Clear existing data
         await collection.drop()
+        self._indexes_ensured = False
+        self._search_cache.clear()
 
-        documents = _build_station_documents(response)
         documents = _build_station_documents(response)
 
         if documents:
             await collection.insert_many(documents)
             # Create indexes
-            await collection.create_index("code", unique=True)
-            await collection.create_index("title")
-            await collection.create_index("all_codes")
+            await self._ensure_indexes(collection)
+            self._indexes_ensured = True
             self._logger.info("Inserted %d stations into MongoDB", len(documents))
 
     async def close(self):
@@ -2,7 +2,7 @@
 
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Literal, Optional, cast
+from typing import Any, Dict, List, Literal, Optional, Tuple, cast
 
 from pydantic import BaseModel
 
@@ -17,11 +17,15 @@ logger = get_logger(__name__)
 
 
 class CandidateThread(BaseModel):
-    """Candidate thread for a user."""
+    """Candidate thread for a user.
+
+    Times are stored as BSON dates; documents written with ISO strings
+    still validate because pydantic parses them.
+    """
 
     thread_uid: str
-    departure_time: str
-    arrival_time: str
+    departure_time: datetime
+    arrival_time: datetime
     from_station_code: str
     to_station_code: str
     from_station_title: str
@@ -49,8 +53,8 @@ class ThreadMatch(BaseModel):
     """Matched users for a thread."""
 
     thread_uid: str
-    departure_time: str
-    arrival_time: str
+    departure_time: datetime
+    arrival_time: datetime
     users: List[Dict[str, Any]]  # List of user info dicts
     created_at: datetime
 
@@ -144,7 +148,11 @@ class ThreadMatchingService:
         try:
             await collection.create_index("expires_at", expireAfterSeconds=0)
             await collection.create_index("telegram_id")
-            await collection.create_index(THREAD_UID_FIELD)
+            # Serves the thread overlap lookup including its exclude-self
+            # predicate; the thread UID prefix also covers plain UID queries
+            await collection.create_index(
+                [(THREAD_UID_FIELD, 1), ("telegram_id", 1)]
+            )
             logger.debug(
                 "TTL and query indexes ensured on %s collection", collection_name
             )
@@ -226,174 +234,129 @@ class ThreadMatchingService:
             )
             return False
 
-    async def find_matches(self, telegram_id: int) -> Dict[str, List[Dict[str, Any]]]:
-        """Find matches for a user's candidate threads.
+    async def find_users_to_notify_and_matches(
+        self,
+        telegram_id: int,
+        thread_uids: List[str],
+        username: Optional[str],
+        first_name: Optional[str],
+        from_station_title: str,
+        to_station_title: str,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        """Find who to notify about a user's new search and who they match.
+
+        Both answers come from the same documents (other users sharing any of
+        the given threads), so one aggregation returns them in a single
+        round-trip. The searching user's details are passed in rather than
+        read back, so this can run concurrently with storing their search.
 
         Args:
-            telegram_id: User's Telegram ID
+            telegram_id: Telegram ID of the user who is searching
+            thread_uids: Thread UIDs of that user's candidate threads
+            username: Searching user's username
+            first_name: Searching user's first name
+            from_station_title: Searching user's from station title
+            to_station_title: Searching user's to station title
 
         Returns:
-            Dict mapping thread_uid to list of matched users
+            Tuple of (user info dicts to notify, dict mapping thread_uid to
+            list of matched users)
         """
         try:
-            collection = await self.get_search_results_collection()
-
-            # Get current user's search results
-            user_doc = await collection.find_one({"telegram_id": telegram_id})
-            if not user_doc:
-                logger.warning("No search results found for user %s", telegram_id)
-                return {}
-
-            user_threads = {
-                ct["thread_uid"] for ct in user_doc.get("candidate_threads", [])
-            }
-            if not user_threads:
+            if not thread_uids:
                 logger.info("User %s has no candidate threads", telegram_id)
-                return {}
+                return [], {}
+
+            collection = await self.get_search_results_collection()
 
             logger.info(
                 "Finding matches for user %s with %d candidate threads",
                 telegram_id,
-                len(user_threads),
+                len(thread_uids),
             )
 
-            # Find all other users with overlapping thread UIDs
-            matches: Dict[str, List[Dict[str, Any]]] = {}
-
-            # Query for documents with matching thread UIDs
-            cursor = collection.find(
+            # Served by the (thread UID, telegram_id) index; returns only the
+            # fields the reply needs, with display defaults filled in and
+            # candidate threads narrowed to the overlapping ones
+            pipeline = [
                 {
-                    THREAD_UID_FIELD: {"$in": list(user_threads)},
-                    "telegram_id": {"$ne": telegram_id},  # Exclude current user
-                }
-            )
-
-            async for other_doc in cursor:
-                other_telegram_id = other_doc["telegram_id"]
-                other_threads = other_doc.get("candidate_threads", [])
-
-                # Find which threads match
-                for thread in other_threads:
-                    thread_uid = thread.get("thread_uid")
-                    if thread_uid in user_threads:
-                        user_info = {
-                            "telegram_id": other_telegram_id,
-                            "username": other_doc.get("username"),
-                            "first_name": other_doc.get("first_name"),
-                            "last_name": other_doc.get("last_name"),
-                            "from_station_code": other_doc.get("from_station_code"),
-                            "to_station_code": other_doc.get("to_station_code"),
-                            "from_station_title": other_doc.get("from_station_title"),
-                            "to_station_title": other_doc.get("to_station_title"),
-                            "departure_time": thread.get("departure_time"),
-                            "arrival_time": thread.get("arrival_time"),
-                        }
-
-                        if thread_uid not in matches:
-                            matches[thread_uid] = []
-                        matches[thread_uid].append(user_info)
-
-            # Only return threads with at least one other user
-            result = {uid: users for uid, users in matches.items() if len(users) >= 1}
-
-            logger.info(
-                "Found %d matching threads for user %s", len(result), telegram_id
-            )
-            return result
-
-        except Exception as e:
-            logger.error("Failed to find matches for user %s: %s", telegram_id, e)
-            return {}
-
-    async def find_users_to_notify(
-        self, new_user_telegram_id: int, new_user_threads: List[str]
-    ) -> List[Dict[str, Any]]:
-        """Find existing users who should be notified about a new matching user.
-
-        When a new user stores their search results, this method finds all existing
-        users whose candidate threads overlap with the new user's threads.
-
-        Args:
-            new_user_telegram_id: The telegram ID of the new user who just searched
-            new_user_threads: List of thread UIDs for the new user
-
-        Returns:
-            List of user info dicts for users who should be notified
-        """
-        try:
-            if not new_user_threads:
-                return []
-
-            collection = await self.get_search_results_collection()
-
-            # Get the new user's document to include in notifications
-            new_user_doc = await collection.find_one(
-                {"telegram_id": new_user_telegram_id}
-            )
-            if not new_user_doc:
-                logger.warning(
-                    "No document found for new user %s", new_user_telegram_id
-                )
-                return []
-
-            # Find all users who have any of the same thread UIDs
-            cursor = collection.find(
+                    "$match": {
+                        THREAD_UID_FIELD: {"$in": thread_uids},
+                        "telegram_id": {"$ne": telegram_id},  # Exclude current user
+                    }
+                },
                 {
-                    THREAD_UID_FIELD: {"$in": new_user_threads},
-                    "telegram_id": {
-                        "$ne": new_user_telegram_id
-                    },  # Exclude the new user
-                }
-            )
+                    "$project": {
+                        "_id": 0,
+                        "telegram_id": 1,
+                        "username": {"$ifNull": ["$username", ""]},
+                        "first_name": {"$ifNull": ["$first_name", ""]},
+                        "last_name": {"$ifNull": ["$last_name", ""]},
+                        "from_station_code": 1,
+                        "to_station_code": 1,
+                        "from_station_title": {"$ifNull": ["$from_station_title", "?"]},
+                        "to_station_title": {"$ifNull": ["$to_station_title", "?"]},
+                        "candidate_threads": {
+                            "$filter": {
+                                "input": "$candidate_threads",
+                                "as": "thread",
+                                "cond": {"$in": ["$$thread.thread_uid", thread_uids]},
+                            }
+                        },
+                    }
+                },
+            ]
+            cursor = await collection.aggregate(pipeline)
 
-            users_to_notify = []
-            notified_telegram_ids = set()  # Avoid duplicate notifications
+            users_to_notify: List[Dict[str, Any]] = []
+            matches: Dict[str, List[Dict[str, Any]]] = {}
+            new_user_name = first_name or username or "Пользователь"
 
             async for other_doc in cursor:
-                other_telegram_id = other_doc["telegram_id"]
-
-                # Skip if already added
-                if other_telegram_id in notified_telegram_ids:
-                    continue
-
-                # Check if this user has any overlapping threads
-                other_threads = other_doc.get("candidate_threads", [])
-                matching_thread_uids = [
-                    thread.get("thread_uid")
-                    for thread in other_threads
-                    if thread.get("thread_uid") in new_user_threads
-                ]
-
-                if matching_thread_uids:
-                    # Build user info with the new user's details
+                # Build user info with the new user's details
+                users_to_notify.append(
+                    {
+                        "telegram_id": other_doc["telegram_id"],
+                        "matching_threads": [
+                            thread["thread_uid"]
+                            for thread in other_doc["candidate_threads"]
+                        ],
+                        "new_user_name": new_user_name,
+                        "new_user_from_title": from_station_title,
+                        "new_user_to_title": to_station_title,
+                    }
+                )
+
+                for thread in other_doc["candidate_threads"]:
                     user_info = {
-                        "telegram_id": other_telegram_id,
-                        "matching_threads": matching_thread_uids,
-                        "new_user_name": (
-                            new_user_doc.get("first_name")
-                            or new_user_doc.get("username")
-                            or "Пользователь"
-                        ),
-                        "new_user_from_title": new_user_doc.get("from_station_title"),
-                        "new_user_to_title": new_user_doc.get("to_station_title"),
+                        "telegram_id": other_doc["telegram_id"],
+                        "username": other_doc["username"],
+                        "first_name": other_doc["first_name"],
+                        "last_name": other_doc["last_name"],
+                        "from_station_code": other_doc.get("from_station_code"),
+                        "to_station_code": other_doc.get("to_station_code"),
+                        "from_station_title": other_doc["from_station_title"],
+                        "to_station_title": other_doc["to_station_title"],
+                        "departure_time": thread.get("departure_time"),
+                        "arrival_time": thread.get("arrival_time"),
                     }
-                    users_to_notify.append(user_info)
-                    notified_telegram_ids.add(other_telegram_id)
+                    matches.setdefault(thread["thread_uid"], []).append(user_info)
 
             logger.info(
-                "Found %d existing users to notify about new user %s",
+                "Found %d existing users to notify and %d matching threads for user %s",
                 len(users_to_notify),
-                new_user_telegram_id,
+                len(matches),
+                telegram_id,
             )
-            return users_to_notify
+            return users_to_notify, matches
 
         except Exception as e:
             logger.error(
-                "Failed to find users to notify for new user %s: %s",
-                new_user_telegram_id,
+                "Failed to find users to notify and matches for user %s: %s",
+                telegram_id,
                 e,
             )
-            return []
+            return [], {}
 
     async def get_user_search_results(
         self, telegram_id: int
@@ -1,5 +1,8 @@
 """Cached client wrapper for Yandex Schedules API."""
 
+import asyncio
+from typing import Optional
+
 from config.log_setup import get_logger
 from services.cache.redis_cache import get_cache
 from .client import YandexSchedules
@@ -16,6 +19,9 @@ class CachedYandexSchedules:
         """Initialize with YandexSchedules client and cache."""
         self.client = YandexSchedules(api_key=api_key, timeout=timeout)
         self.cache = get_cache()
+        # Schedule lookups in progress, keyed by request, so concurrent
+        # callers asking for the same schedule share one fetch
+        self._inflight_schedules: dict[str, asyncio.Task] = {}
 
     async def start(self):
         """Start the underlying client."""
@@ -79,9 +85,29 @@ class CachedYandexSchedules:
     async def get_schedule(self, req: ScheduleRequest) -> tuple[ScheduleResponse, bool]:
         """Get schedule results with caching.
 
+        Concurrent calls for the same request wait on a single cache lookup
+        and, on a miss, a single API call.
+
         Returns:
             tuple: (ScheduleResponse, was_cached: bool)
         """
+        key = req.model_dump_json(exclude_none=True)
+        task = self._inflight_schedules.get(key)
+        if task is None:
+            task = asyncio.create_task(self._get_schedule(req))
+            self._inflight_schedules[key] = task
+            task.add_done_callback(
+                lambda _: self._inflight_schedules.pop(key, None)
+            )
+            task.add_done_callback(_log_schedule_fetch_failure)
+        else:
+            logger.debug("Joining in-flight schedule fetch for station %s", req.station)
+        # Shielded so one caller going away does not cancel the others
+        return await asyncio.shield(task)
+
+    async def _get_schedule(
+        self, req: ScheduleRequest
+    ) -> tuple[ScheduleResponse, bool]:
         # Try cache first
         cached_response = await self.cache.get_schedule_results(req)
 
@@ -105,6 +131,18 @@ class CachedYandexSchedules:
             # Re-raise the exception to be handled by the caller
             raise
 
+        # Station metadata changes far less often than departures, so it is
+        # kept under its own long TTL and fills in responses that lack it.
+        # Its write runs alongside the schedule write below
+        station_write = None
+        if req.station:
+            if response.station:
+                station_write = asyncio.create_task(
+                    self.cache.set_station_info(req.station, response.station)
+                )
+            else:
+                response.station = await self.cache.get_station_info(req.station)
+
         # Cache the response only if it's valid
         if response and response.schedule:
             cache_success = await self.cache.set_schedule_results(req, response)
@@ -117,8 +155,20 @@ class CachedYandexSchedules:
                 "Not caching empty schedule response for station %s", req.station
             )
 
+        if station_write is not None:
+            await station_write
+
         return response, False
 
+    async def get_stale_schedule(
+        self, req: ScheduleRequest
+    ) -> Optional[ScheduleResponse]:
+        """Get the last cached schedule regardless of freshness.
+
+        Used as a fallback after ``get_schedule`` failed to reach the API.
+        """
+        return await self.cache.get_stale_schedule_results(req)
+
     # Pass-through methods for other API calls (no caching needed for these)
     async def get_copyright(self):
         """Get copyright information (no caching)."""
@@ -143,3 +193,38 @@ class CachedYandexSchedules:
     async def get_cache_stats(self) -> dict:
         """Get cache statistics."""
         return await self.cache.get_cache_stats()
+
+
+def _log_schedule_fetch_failure(task: asyncio.Task) -> None:
+    """Retrieve and log a shared fetch's failure.
+
+    If every caller was cancelled, nobody else reads the exception and
+    asyncio would only report it as never retrieved.
+    """
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Shared schedule fetch failed: %s", task.exception())
+
+
+# Global client instance
+_client_instance: Optional[CachedYandexSchedules] = None
+
+
+def get_cached_client() -> CachedYandexSchedules:
+    """Get or create the global cached client instance.
+
+    The underlying HTTP session is opened lazily on the first request and
+    reused afterwards, so handlers should not wrap this in ``async with``.
+    """
+    global _client_instance
+    if _client_instance is None:
+        _client_instance = CachedYandexSchedules()
+        logger.debug("Created cached Yandex Schedules client instance")
+    return _client_instance
+
+
+async def close_cached_client() -> None:
+    """Close the global cached client if one was ever created."""
+    global _client_instance
+    if _client_instance is not None:
+        await _client_instance.close()
+        _client_instance = None